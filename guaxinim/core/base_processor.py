@@ -1,8 +1,9 @@
 """Base processor module for handling document processing and OpenAI integration."""
-import json
 from pathlib import Path
 from typing import Dict, List, Tuple
 import openai
+import orjson
+from guaxinim.core.openai_client import MAX_RETRIES, get_shared_http_client
 
 class BaseProcessor:
     """Base class for processing documents and generating summaries using OpenAI."""
@@ -12,6 +13,7 @@ class BaseProcessor:
         self.base_input_dir = Path(input_dir)
         self.base_output_dir = Path(output_dir)
         self.base_output_dir.mkdir(parents=True, exist_ok=True)
+        self.client = openai.OpenAI(http_client=get_shared_http_client(), max_retries=MAX_RETRIES)
 
     def get_summary_and_tags(self, text: str, title: str) -> Tuple[str, List[str]]:
         """Generate summary and tags using OpenAI."""
@@ -42,7 +44,7 @@ class BaseProcessor:
 
                     You are an expert document analyst focusing on extracting key information and themes from technical content."""
 
-        response = openai.chat.completions.create(
+        response = self.client.chat.completions.create(
             model="gpt-3.5-turbo-16k",
             messages=[
                 {"role": "system", "content": "You are a helpful assistant that analyzes documents and provides summaries and tags."},
@@ -60,8 +62,14 @@ class BaseProcessor:
 
         return summary_section, tags
 
-    def save_processed_file(self, data: Dict, output_file: Path):
-        """Save processed data to a JSON file."""
-        with open('{}/{}'.format(self.base_output_dir, output_file), 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+    def save_processed_file(self, data: Dict, output_file: Path, pretty: bool = False):
+        """Save processed data to a compact JSON file.
+
+        Args:
+            data (Dict): Processed document data
+            output_file (Path): File name relative to the output directory
+            pretty (bool): Indent the JSON for local inspection
+        """
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        (self.base_output_dir / output_file).write_bytes(orjson.dumps(data, option=option))
         print(f"Saved processed data to {output_file}")
@@ -4,7 +4,29 @@ Manages the GuaxinimBot instance to ensure a single instance is used across the
 """
 
 import streamlit as st
-from guaxinim.core.guaxinim_bot import GuaxinimBot
+from openai import OpenAI
+from sentence_transformers import SentenceTransformer
+from guaxinim.core.guaxinim_bot import GuaxinimBot, load_openai_api_key
+from guaxinim.core.openai_client import MAX_RETRIES, get_shared_http_client
+
+
+@st.cache_resource
+def get_encoder(model_name: str = 'all-MiniLM-L6-v2') -> SentenceTransformer:
+    """Load the sentence-transformer once so bot rebuilds reuse its weights."""
+    return SentenceTransformer(model_name)
+
+
+@st.cache_resource
+def get_openai_client() -> OpenAI:
+    """Create the OpenAI client shared by every bot in this Streamlit server."""
+    return OpenAI(api_key=load_openai_api_key(), http_client=get_shared_http_client(),
+                  max_retries=MAX_RETRIES)
+
+@st.cache_resource
+def warm_guides_once(max_whole_files: int, similarity_field: str, _bot: GuaxinimBot) -> None:
+    """Pre-compute the brewing guides once per process and bot settings, not for every session."""
+    _bot.warm_guides()
+
 
 def get_bot(max_whole_files: int = None, similarity_field: str = None) -> GuaxinimBot:
     """Get or create a GuaxinimBot instance.
@@ -32,8 +54,12 @@ def get_bot(max_whole_files: int = None, similarity_field: str = None) -> Guaxin
     if 'guaxinim_bot' not in st.session_state or settings_changed:
         st.session_state.guaxinim_bot = GuaxinimBot(
             max_whole_files=max_whole_files,
-            similarity_field=similarity_field or "chunks"
+            similarity_field=similarity_field or "chunks",
+            encoder=get_encoder(),
+            client=get_openai_client()
         )
+        # Pre-compute the brewing guides so the first request for each is a cache hit
+        warm_guides_once(max_whole_files, similarity_field or 'chunks', st.session_state.guaxinim_bot)
         # Update stored settings
         st.session_state.bot_settings = {
             'max_whole_files': max_whole_files,
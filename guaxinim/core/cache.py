@@ -3,17 +3,24 @@ Cache Module
 Provides persistent caching functionality using Redis.
 """
 
-from dataclasses import asdict, is_dataclass
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextvars import ContextVar
+from dataclasses import fields, is_dataclass
 from functools import wraps
-import json
-import os
-import pickle
-from pathlib import Path
-from typing import Any, Callable
+import hashlib
+import inspect
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple, get_type_hints
+import msgspec
 import redis
 from guaxinim.core.logger import logger
 
 # Initialize Redis client
+redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=False)
+
 def clear_cache() -> None:
     """Clear all cached responses from Redis."""
     try:
@@ -25,55 +32,179 @@ def clear_cache() -> None:
                 redis_client.delete(*keys)
             if cursor == 0:
                 break
+        for l1_cache in _l1_caches:
+            l1_cache.clear()
+        # Reset the in-memory semantic caches of every live session, not just the current one
+        for semantic_cache in list(_semantic_caches):
+            semantic_cache.clear()
         logger.info("🧹 Cache cleared successfully!")
     except Exception as e:
         logger.error(f"Error clearing cache: {e}")
         raise
 
-redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=False)
+class LRUCache:
+    """A thread-safe in-process LRU cache with per-entry expiry, used in front of Redis."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+# In-process caches created by persistent_cache, cleared together with Redis
+_l1_caches: List[LRUCache] = []
+
+# Live SemanticCache instances, cleared together with Redis; held weakly so dropped bots are freed
+_semantic_caches: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+def register_semantic_cache(semantic_cache: Any) -> None:
+    """Register a SemanticCache so clear_cache also resets its in-memory indexes."""
+    _semantic_caches.add(semantic_cache)
+
+# Set while a call made with bypass_cache=True runs, so nested caches skip their lookups too
+_bypass_cache: ContextVar[bool] = ContextVar('guaxinim_bypass_cache', default=False)
+
+# Instance attributes that change a method's output and are therefore part of its cache key
+KEY_INSTANCE_ATTRS = ('similarity_field', 'GPT_MODEL', 'TEMPERATURE')
+
+def cache_bypassed() -> bool:
+    """Whether the current call was made with bypass_cache=True."""
+    return _bypass_cache.get()
+
+# Sorted-key JSON encoder so equal arguments always produce the same cache key
+key_encoder = msgspec.json.Encoder(order='sorted')
+value_encoder = msgspec.msgpack.Encoder()
 
-def persistent_cache(ttl_days: int = 30) -> Callable:
+# Field names per dataclass type, resolved once per type
+_FIELD_CACHE: Dict[type, Tuple[str, ...]] = {}
+
+def fast_asdict(obj: Any) -> Dict[str, Any]:
+    """Shallow dict conversion for flat dataclasses, without asdict's recursive deepcopy."""
+    cls = type(obj)
+    names = _FIELD_CACHE.get(cls)
+    if names is None:
+        names = _FIELD_CACHE.setdefault(cls, tuple(f.name for f in fields(cls)))
+    return {name: getattr(obj, name) for name in names}
+
+def _get_value_decoder(func: Callable) -> msgspec.msgpack.Decoder:
+    """Build a msgpack decoder typed with the function's return annotation."""
+    try:
+        return_type = get_type_hints(func).get('return', Any)
+    except Exception:
+        return_type = Any
+    return msgspec.msgpack.Decoder(type=return_type)
+
+def multi_get(keys: List[str]) -> List[Optional[bytes]]:
+    """Fetch several cache keys in a single Redis round-trip.
+
+    Args:
+        keys (List[str]): Cache keys to fetch
+
+    Returns:
+        List[Optional[bytes]]: Raw cached values, None for misses, in the order of keys
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    for key in keys:
+        pipe.get(key)
+    return pipe.execute()
+
+def multi_set(items: Dict[str, bytes], ttl_days: int = 30) -> None:
+    """Store several cache entries in a single Redis round-trip.
+
+    Args:
+        items (Dict[str, bytes]): Mapping of cache key to encoded value
+        ttl_days (int): Number of days to keep the entries valid
     """
-    A decorator that provides persistent caching using Redis.
+    pipe = redis_client.pipeline(transaction=False)
+    for key, value in items.items():
+        pipe.setex(key, ttl_days * 24 * 60 * 60, value)  # TTL in seconds
+    pipe.execute()
+
+def persistent_cache(ttl_days: int = 30, l1_maxsize: int = 1024,
+                     normalizers: Optional[Dict[str, Callable[[Any], Any]]] = None) -> Callable:
+    """
+    A decorator that provides persistent caching using Redis, fronted by an
+    in-process LRU cache so repeated calls skip the Redis round-trip.
+
+    The decorated function also exposes ``cache_key``, ``get_many`` and ``set_many``
+    so batch code paths can look up and store several calls with one round-trip.
+    Passing ``bypass_cache=True`` to the decorated function skips the lookups and
+    regenerates the result, overwriting the cached entry. Results with a truthy
+    ``is_error`` are never cached.
     
     Args:
         ttl_days (int): Number of days to keep the cache valid
+        l1_maxsize (int): Maximum number of entries kept in the in-process cache
+        normalizers (Dict[str, Callable], optional): Per-argument functions mapping a value to
+            what is keyed, so near-identical arguments share an entry
         
     Returns:
         Callable: The decorated function
     """
+    ttl_seconds = ttl_days * 24 * 60 * 60
+
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(*args, **kwargs) -> Any:
-            # Create a unique key based on function name and arguments
-            # Get the argument names from the function's signature
-            import inspect
-            sig = inspect.signature(func)
-            param_names = list(sig.parameters.keys())
-            
-            # Create args_dict excluding 'self'
-            if param_names and param_names[0] == 'self':
-                args_dict = {}
-                if len(args) > 1:
-                    for i, arg in enumerate(args[1:]):
-                        # Convert dataclass to dict if it is one
-                        if is_dataclass(arg):
-                            args_dict[param_names[i+1]] = asdict(arg)
-                        else:
-                            args_dict[param_names[i+1]] = arg
-            else:
-                args_dict = {}
-                for i, arg in enumerate(args):
-                    # Convert dataclass to dict if it is one
-                    if is_dataclass(arg):
-                        args_dict[param_names[i]] = asdict(arg)
-                    else:
-                        args_dict[param_names[i]] = arg
-                
+        value_decoder = None
+        l1_cache = LRUCache(maxsize=l1_maxsize)
+        _l1_caches.append(l1_cache)
+        # Futures for calls currently executing, so identical concurrent calls run once
+        inflight: Dict[str, Future] = {}
+        inflight_lock = threading.Lock()
+
+        # Resolve the argument names once, at decoration time
+        param_names = list(inspect.signature(func).parameters.keys())
+        skip = 1 if param_names and param_names[0] == 'self' else 0
+        positional_names = param_names[skip:]
+
+        def cache_key(*args, **kwargs) -> str:
+            """Build the cache key for a call with the given arguments."""
+            # Create a unique key based on function name and arguments, excluding 'self'
+            args_dict = {}
+            for name, arg in zip(positional_names, args[skip:]):
+                if normalizers and name in normalizers:
+                    args_dict[name] = normalizers[name](arg)
+                # Convert dataclass to dict if it is one
+                elif is_dataclass(arg):
+                    args_dict[name] = fast_asdict(arg)
+                else:
+                    args_dict[name] = arg
+            if normalizers and kwargs.keys() & normalizers.keys():
+                kwargs = {
+                    name: normalizers[name](value) if name in normalizers else value
+                    for name, value in kwargs.items()
+                }
+
             # Get instance attributes if this is a method call
             instance_attrs = {}
-            if args and hasattr(args[0], 'similarity_field'):
-                instance_attrs['similarity_field'] = args[0].similarity_field
+            if skip and args:
+                for attr in KEY_INSTANCE_ATTRS:
+                    if hasattr(args[0], attr):
+                        instance_attrs[attr] = getattr(args[0], attr)
             
             # Create the cache key
             key_dict = {
@@ -82,33 +213,128 @@ def persistent_cache(ttl_days: int = 30) -> Callable:
                 'kwargs': kwargs,
                 'instance_attrs': instance_attrs  # Include relevant instance attributes
             }
-            cache_key = f"guaxinim:{json.dumps(key_dict, sort_keys=True)}"
+            # Hash the canonical key so Redis keys stay small regardless of argument size
+            key_bytes = key_encoder.encode(key_dict)
+            key = "guaxinim:" + hashlib.blake2b(key_bytes, digest_size=16).hexdigest()
+            logger.debug("Cache key %s for %s", key, key_bytes)
+            return key
+
+        def decode(cached_data: bytes) -> Any:
+            """Decode a cached value into the function's return type."""
+            nonlocal value_decoder
+            if value_decoder is None:
+                value_decoder = _get_value_decoder(func)
+            return value_decoder.decode(cached_data)
+
+        def get_many(keys: List[str]) -> List[Optional[Any]]:
+            """Look up several cache keys at once, returning None for misses."""
+            results = [l1_cache.get(key) for key in keys]
+            missing = [i for i, result in enumerate(results) if result is None]
+            if not missing:
+                return results
+
+            try:
+                cached = multi_get([keys[i] for i in missing])
+            except Exception as e:
+                logger.warning(f"Cache read error: {e}")
+                return results
+
+            for i, cached_data in zip(missing, cached):
+                if not cached_data:
+                    continue
+                try:
+                    results[i] = decode(cached_data)
+                    l1_cache.set(keys[i], results[i], ttl_seconds)
+                except Exception as e:
+                    logger.warning(f"Cache read error: {e}")
+            return results
+
+        def set_many(items: Dict[str, Any]) -> None:
+            """Store several results at once, keyed by their cache keys."""
+            for key, result in items.items():
+                l1_cache.set(key, result, ttl_seconds)
+            try:
+                multi_set({key: value_encoder.encode(result) for key, result in items.items()}, ttl_days)
+            except Exception as e:
+                logger.warning(f"Cache write error: {e}")
+
+        @wraps(func)
+        def wrapper(*args, bypass_cache: bool = False, **kwargs) -> Any:
+            key = cache_key(*args, **kwargs)
+            if bypass_cache or cache_bypassed():
+                token = _bypass_cache.set(True)
+                try:
+                    result = func(*args, **kwargs)
+                finally:
+                    _bypass_cache.reset(token)
+                if not getattr(result, 'is_error', False):
+                    set_many({key: result})
+                    logger.info(f"💾 Regenerated response for {func.__name__}")
+                return result
+
+            # Check the in-process cache before going to Redis
+            result = l1_cache.get(key)
+            if result is not None:
+                logger.info(f"✨ Using cached response for {func.__name__} - Saved an API call!")
+                return result
             
             # Try to get from cache first
             try:
-                cached_data = redis_client.get(cache_key)
+                cached_data = redis_client.get(key)
                 if cached_data:
-                    result = pickle.loads(cached_data)
+                    result = decode(cached_data)
+                    l1_cache.set(key, result, ttl_seconds)
                     logger.info(f"✨ Using cached response for {func.__name__} - Saved an API call!")
                     return result
             except Exception as e:
                 logger.warning(f"Cache read error: {e}")
             
+            # Wait for an identical call already executing instead of repeating it
+            with inflight_lock:
+                future = inflight.get(key)
+                is_owner = future is None
+                if is_owner:
+                    future = inflight[key] = Future()
+            if not is_owner:
+                logger.info(f"⏳ Waiting for in-flight {func.__name__} call with the same arguments")
+                return future.result()
+
             # Execute the function if not in cache
-            result = func(*args, **kwargs)
+            try:
+                result = func(*args, **kwargs)
+                # Do not keep errors around, so a transient failure is retried on the next call
+                is_error = getattr(result, 'is_error', False)
+                if not is_error:
+                    # Fill the in-process cache before leaving in-flight, so identical calls
+                    # arriving in between find the result instead of repeating the call
+                    l1_cache.set(key, result, ttl_seconds)
+                future.set_result(result)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with inflight_lock:
+                    del inflight[key]
+
+            if is_error:
+                return result
             
             # Save to cache
             try:
-                pickled_result = pickle.dumps(result)
+                encoded_result = value_encoder.encode(result)
                 redis_client.setex(
-                    cache_key,
-                    ttl_days * 24 * 60 * 60,  # TTL in seconds
-                    pickled_result
+                    key,
+                    ttl_seconds,
+                    encoded_result
                 )
                 logger.info(f"💾 Caching response for {func.__name__} for future use")
             except Exception as e:
                 logger.warning(f"Cache write error: {e}")
             
             return result
+
+        wrapper.cache_key = cache_key
+        wrapper.get_many = get_many
+        wrapper.set_many = set_many
         return wrapper
     return decorator
@@ -2,7 +2,21 @@
 Data class for coffee preparation parameters.
 """
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, Optional
+
+
+def _bucket(value: Optional[float], size: float) -> Optional[float]:
+    """Round a value to the nearest multiple of size, keeping None."""
+    if value is None:
+        return None
+    return round(round(value / size) * size, 6)
+
+
+def _normalize_text(value: Optional[str]) -> Optional[str]:
+    """Lowercase and collapse whitespace in a free-text field, keeping None."""
+    if value is None:
+        return None
+    return " ".join(value.split()).lower() or None
 
 
 # pylint: disable=too-many-instance-attributes
@@ -37,3 +51,39 @@ class CoffeePreparationData:
     number_of_pours: Optional[int] = None
     amount_in_each_pour: Optional[float] = None
     notes: Optional[str] = None
+
+    # Bucket sizes used by cache_bucket()
+    RATIO_DECIMALS = 1
+    COFFEE_BUCKET_GRAMS = 1
+    TEMPERATURE_BUCKET_CELSIUS = 2
+    TIME_BUCKET_SECONDS = 10
+    POUR_BUCKET_ML = 10
+
+    def cache_bucket(self) -> Dict[str, Any]:
+        """
+        Return the parameters discretized into buckets, for use as a cache key.
+
+        Preparations that differ only by small measurement noise (e.g. 93.5°C vs 94°C,
+        or "Too bitter" vs "too bitter") map to the same bucket and share cached suggestions.
+        The water amount is keyed through the brew ratio.
+
+        Returns:
+            Dict[str, Any]: Bucketed parameters
+        """
+        ratio = None
+        if self.amount_of_coffee and self.amount_of_water:
+            ratio = round(self.amount_of_water / self.amount_of_coffee, self.RATIO_DECIMALS)
+        return {
+            'issue_encountered': _normalize_text(self.issue_encountered),
+            'brewing_method': _normalize_text(self.brewing_method),
+            'amount_of_coffee': _bucket(self.amount_of_coffee, self.COFFEE_BUCKET_GRAMS),
+            'ratio': ratio,
+            'type_of_bean': _normalize_text(self.type_of_bean),
+            'total_extraction_time': _bucket(self.total_extraction_time, self.TIME_BUCKET_SECONDS),
+            'water_temperature': _bucket(self.water_temperature, self.TEMPERATURE_BUCKET_CELSIUS),
+            'grinder_granularity': _normalize_text(self.grinder_granularity),
+            'bloom_time': _bucket(self.bloom_time, self.TIME_BUCKET_SECONDS),
+            'number_of_pours': self.number_of_pours,
+            'amount_in_each_pour': _bucket(self.amount_in_each_pour, self.POUR_BUCKET_ML),
+            'notes': _normalize_text(self.notes),
+        }
@@ -1,49 +1,85 @@
 """Module for creating embeddings from processed documents."""
-import json
+import gc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+import orjson
+import torch
 from sentence_transformers import SentenceTransformer
 
+def _load_document_safe(file_path: Path) -> Tuple[Path, Optional[Dict], Optional[str]]:
+    """Load a document in a worker process, returning the error message instead of raising."""
+    try:
+        return file_path, EmbeddingsProcessor.load_document(file_path), None
+    except Exception as e:
+        return file_path, None, str(e)
+
 class EmbeddingsProcessor:
     """Create and manage embeddings for processed documents."""
 
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
-        """Initialize the embeddings processor."""
-        self.model = SentenceTransformer(model_name)
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', max_workers: Optional[int] = None):
+        """Initialize the embeddings processor.
+
+        Args:
+            model_name (str): Name of the sentence-transformer model to use
+            max_workers (int, optional): Number of workers used to load and save documents.
+                                         Defaults to the executor's own default.
+        """
+        # Run the encoder in half precision when a GPU is available
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.model = SentenceTransformer(model_name, device=device)
+        if device == 'cuda':
+            self.model.half()
+        self.max_workers = max_workers
         self.base_input_dir = Path('data/raw')
         self.output_dir = Path('data/processed/documents')
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-    def split_into_chunks(self, text: str, chunk_size: int = 1000) -> List[str]:
-        """Split text into chunks of approximately equal size."""
+    @staticmethod
+    def split_into_chunks(text: str, chunk_size: int = 1000) -> List[str]:
+        """Split text into chunks of approximately equal size.
+
+        Chunk boundaries are found with a binary search over the cumulative
+        word lengths instead of a per-word Python loop.
+        """
         words = text.split()
+        if not words:
+            return []
+
+        # cumulative[i] is the size of words[:i], counting one space per word
+        cumulative = np.zeros(len(words) + 1, dtype=np.int64)
+        np.cumsum(
+            np.fromiter((len(word) + 1 for word in words), dtype=np.int64, count=len(words)),
+            out=cumulative[1:]
+        )
+
         chunks = []
-        current_chunk = []
-        current_size = 0
-        
-        for word in words:
-            current_size += len(word) + 1  # +1 for space
-            if current_size > chunk_size:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = [word]
-                current_size = len(word)
-            else:
-                current_chunk.append(word)
-        
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
-        
+        start = 0
+        while start < len(words):
+            # The first word of every chunk after the first is counted without its space
+            limit = cumulative[start] + chunk_size + (1 if start else 0)
+            end = int(np.searchsorted(cumulative, limit, side='right')) - 1
+            end = max(end, start + 1)
+            chunks.append(' '.join(words[start:end]))
+            start = end
+
         return chunks
 
-    def create_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Create embeddings for a list of texts."""
-        embeddings = self.model.encode(texts, show_progress_bar=True)
-        return embeddings.tolist()
+    def create_embeddings(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Create embeddings for a list of texts in a single encode call."""
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+            normalize_embeddings=False
+        )
 
-    def process_document(self, file_path: Path) -> Dict:
-        """Process a single document and create embeddings."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+    @staticmethod
+    def load_document(file_path: Path) -> Dict:
+        """Load a processed document and split its full text into chunks."""
+        data = orjson.loads(file_path.read_bytes())
 
         # Extract fields, handling both flat and nested structures
         try:
@@ -63,50 +99,100 @@ class EmbeddingsProcessor:
         except KeyError as e:
             raise ValueError(f"Missing required field in {file_path.name}: {e}") from e
 
-        # Split full text into chunks
-        chunks = self.split_into_chunks(full_text)
-        
-        # Create embeddings
-        chunk_embeddings = self.create_embeddings(chunks)
-        title_embedding = self.create_embeddings([title])[0]
-        summary_embedding = self.create_embeddings([summary])[0]
-        
-        # Prepare processed data with embeddings
-        processed_data = {
+        return {
             "title": title,
-            "title_embedding": title_embedding,
             "source": source,
             "summary": summary,
-            "summary_embedding": summary_embedding,
             "tags": tags,
-            "chunks": chunks,
-            "chunk_embeddings": chunk_embeddings,
+            "chunks": EmbeddingsProcessor.split_into_chunks(full_text),
             "full_text": full_text  # Include the full text in the final output
         }
 
-        return processed_data
+    def save_document(self, document: Dict, embeddings: np.ndarray, output_file: Path):
+        """Save document metadata as JSON and its embeddings as a float16 .npy sidecar.
+
+        The sidecar holds one row per text: title, summary, then each chunk.
+        Half precision halves disk and memory use; the searcher widens rows to float32.
+        """
+        np.save(output_file.with_suffix('.npy'), np.asarray(embeddings, dtype=np.float16))
+        output_file.write_bytes(orjson.dumps(document))
+
+    def process_document(self, file_path: Path) -> Path:
+        """Process a single document, create its embeddings and save them.
+
+        Returns:
+            Path: The saved document's JSON file
+        """
+        document = self.load_document(file_path)
+
+        # Create all embeddings in one batch: title, summary, then chunks
+        embeddings = self.create_embeddings(
+            [document["title"], document["summary"]] + document["chunks"]
+        )
+        output_file = self.output_dir / file_path.name
+        self.save_document(document, embeddings, output_file)
+        return output_file
 
     def process_all_documents(self):
-        """Process all documents from both PDF and YouTube sources."""
+        """Process all documents from both PDF and YouTube sources.
+
+        Documents are loaded first, then every title, summary and chunk across the
+        corpus is embedded in a single batched encode call before results are saved.
+        """
         source_types = ['pdf_processed', 'youtube_processed']
-        
+
+        file_paths = []
         for source_type in source_types:
             input_base = self.base_input_dir / source_type
             if not input_base.exists():
                 print(f"Warning: Directory not found: {input_base}")
                 continue
+            file_paths.extend(input_base.glob('**/*.json'))
+
+        if not file_paths:
+            return
+
+        # Phase A: load and chunk every document in parallel, recording its slice of the batch
+        documents = []
+        texts = []
+        print(f"Loading {len(file_paths)} documents...")
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            for file_path, document, error in executor.map(_load_document_safe, file_paths, chunksize=8):
+                if error:
+                    print(f"Error processing {file_path.name}: {error}")
+                    continue
+
+                start = len(texts)
+                texts.extend([document["title"], document["summary"]])
+                texts.extend(document["chunks"])
+                documents.append((file_path, document, start, len(texts)))
+
+        if not documents:
+            return
+
+        # Phase B: embed the whole corpus at once
+        print(f"Creating embeddings for {len(texts)} texts from {len(documents)} documents...")
+        embeddings = self.create_embeddings(texts, batch_size=128)
+        del texts  # The strings are still referenced by their documents
+
+        # Phase C: scatter embeddings back to their documents and save them concurrently
+        def save(entry):
+            file_path, document, start, end = entry
+            try:
+                # Save processed data with embeddings
+                output_file = self.output_dir / file_path.name
+                self.save_document(document, embeddings[start:end], output_file)
+                print(f"Saved embeddings to {output_file}")
+
+            except Exception as e:
+                print(f"Error processing {file_path.name}: {str(e)}")
+
+            finally:
+                # Release the full text and chunks as soon as the document is written
+                document.clear()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(save, documents))
 
-            # Process all JSON files in this source type directory
-            for file_path in input_base.glob('**/*.json'):
-                try:
-                    print(f"Processing {file_path.relative_to(self.base_input_dir)}...")
-                    processed_data = self.process_document(file_path)
-                    
-                    # Save processed data with embeddings
-                    output_file = self.output_dir / file_path.name
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        json.dump(processed_data, f, indent=2, ensure_ascii=False)
-                    print(f"Saved embeddings to {output_file}")
-                
-                except Exception as e:
-                    print(f"Error processing {file_path.name}: {str(e)}")
+        del documents
+        gc.collect()
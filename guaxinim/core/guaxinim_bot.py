@@ -4,28 +4,74 @@ This module implements the AI-powered coffee assistant that provides
 recommendations and answers coffee-related questions using OpenAI's API.
 """
 
+import asyncio
 import os
+import queue
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cached_property, lru_cache
+from pathlib import Path
 from openai import OpenAI, APIError, APIConnectionError
 from guaxinim.core.cache import persistent_cache
+from guaxinim.core.openai_client import MAX_RETRIES, get_shared_http_client, request_slots
+from guaxinim.core.semantic_cache import SemanticCache, semantic_cached
+from guaxinim.core.tokens import pack_to_budget
 from dotenv import load_dotenv
-from typing import List, Dict, Union
+from typing import Callable, Dict, Generator, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass
 from guaxinim.core.coffee_data import CoffeePreparationData
-from src.pdf_processor.similarity_search import DocumentSearcher
+from src.pdf_processor.similarity_search import DocumentSearcher, get_shared_searcher
 from guaxinim.core.logger import logger
 
-# Load environment variables
-load_dotenv(override=True)
+# Load environment variables from the project's .env file, if there is one
+ENV_FILE = Path(__file__).resolve().parents[2] / ".env"
+if ENV_FILE.exists():
+    load_dotenv(ENV_FILE, override=True)
 
-def get_env_var(key: str) -> str:
-    """Get environment variable from either .env or Streamlit secrets"""
-    # Try to get from streamlit secrets first
+# Pool for retrieving context for several queries at once, so their embeddings are batched
+retrieval_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="guaxinim-retrieval")
+
+# Background pool for pre-computing cached guides, small to stay clear of rate limits
+warmup_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="guaxinim-warmup")
+
+# Callback receiving answer text as it is generated, set by GuaxinimBot.streaming()
+_stream_callback: ContextVar[Optional[Callable[[str], None]]] = ContextVar('guaxinim_stream_callback', default=None)
+
+@lru_cache(maxsize=None)
+def load_streamlit_secrets() -> Dict[str, str]:
+    """Read the Streamlit secrets once, returning an empty dict outside Streamlit or without a secrets file"""
     try:
         import streamlit as st
-        return st.secrets[key]
-    except:
-        # Fall back to os.environ
-        return os.getenv(key)
+        return dict(st.secrets)
+    except Exception:
+        return {}
+
+
+def get_env_var(key: str) -> str:
+    """Get environment variable from either .env or Streamlit secrets"""
+    # Streamlit secrets take precedence over os.environ
+    secrets = load_streamlit_secrets()
+    if key in secrets:
+        return secrets[key]
+    return os.getenv(key)
+
+
+def load_openai_api_key() -> str:
+    """Resolve the OpenAI API key and export it for OpenAI clients.
+
+    Raises:
+        ValueError: If no API key is configured
+    """
+    api_key = get_env_var("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError(
+            "OpenAI API key not found. Please set the OPENAI_API_KEY environment variable."
+        )
+    os.environ["OPENAI_API_KEY"] = api_key  # Set for OpenAI client
+    return api_key
 
 
 @dataclass
@@ -39,6 +85,11 @@ class GuaxinimResponse:
         """Create an error response"""
         return cls(answer=f"Error: {message}", sources=[])
 
+    @property
+    def is_error(self) -> bool:
+        """Whether this response was created by error()"""
+        return self.answer.startswith("Error: ")
+
 
 class GuaxinimBot:
     """
@@ -52,6 +103,12 @@ class GuaxinimBot:
     TEMPERATURE = 0.2
     DEFAULT_MAX_WHOLE_FILES = 2
     SIMILARITY_THRESHOLD = 0.5  # Minimum similarity score for considering a document relevant
+    SEMANTIC_CACHE_THRESHOLD = 0.95  # Minimum query similarity for reusing a cached answer
+    SEMANTIC_CACHE_TTL_DAYS = 7  # Days a semantically cached answer stays valid
+    SUPPORTED_METHODS = ("V60", "French Press", "Aeropress", "Chemex", "Moka Pot", "Espresso")
+    RETRIEVAL_CACHE_SIZE = 256  # Number of recent queries whose search results are memoized
+    FORMAT_CACHE_SIZE = 1024  # Number of formatted retrieved chunks kept for reuse in prompts
+    CONTEXT_TOKEN_BUDGET = 3000  # Maximum prompt tokens spent on retrieved context
     PREVIEW_LENGTH = 500  # Number of characters to show in document previews  # Default number of whole files to return  # Lower temperature for more focused and consistent responses
 
     COFFEE_GUIDE_PROMPT = """Goal: Create a comprehensive brewing guide for making coffee using the {method} method, ensuring it is detailed enough for a beginner to follow successfully.
@@ -95,28 +152,86 @@ You are a professional barista with years of experience teaching beginners. Your
 
     CONTEXT_PROMPT_TEMPLATE = """Goal: Provide a clear, accurate, and helpful answer to a coffee-related question using both provided context and barista expertise.
 
-    Return Format:
-    Your response should be structured as follows:
-    1. Direct answer to the question (2-3 sentences)
-    2. Supporting explanation with technical details (if relevant)
-    3. Practical tips or recommendations (if applicable)
-    4. References to specific sources from context (if available)
+Return Format:
+Your response should be structured as follows:
+1. Direct answer to the question (2-3 sentences)
+2. Supporting explanation with technical details (if relevant)
+3. Practical tips or recommendations (if applicable)
+4. References to specific sources from context (if available)
+
+Warnings:
+- Stick to factual information from the context when available
+- Clearly distinguish between context-based information and general barista knowledge
+- Avoid speculation or unsupported claims
+- Keep the answer focused and relevant to the specific query
 
-    Warnings:
-    - Stick to factual information from the context when available
-    - Clearly distinguish between context-based information and general barista knowledge
-    - Avoid speculation or unsupported claims
-    - Keep the answer focused and relevant to the specific query
+Context:
+---------------------
+{context_str}
+---------------------
+
+Query: {query_str}
+Answer: """
+
+    # Optional CoffeePreparationData fields as (attribute, label, unit) for improvement prompts
+    OPTIONAL_PARAMETERS = (
+        ("type_of_bean", "Bean type", ""),
+        ("total_extraction_time", "Extraction time", "s"),
+        ("water_temperature", "Water temp", "°C"),
+        ("grinder_granularity", "Grind size", ""),
+        ("bloom_time", "Bloom time", "s"),
+        ("number_of_pours", "Number of pours", ""),
+        ("amount_in_each_pour", "Amount per pour", "ml"),
+        ("notes", "Additional notes", ""),
+    )
+
+    # Templates pre-split on their placeholders so prompts are built by concatenation
+    COFFEE_GUIDE_PROMPT_PARTS = tuple(COFFEE_GUIDE_PROMPT.split("{method}"))
+    CONTEXT_PROMPT_PREFIX, _CONTEXT_PROMPT_REST = CONTEXT_PROMPT_TEMPLATE.split("{context_str}")
+    CONTEXT_PROMPT_MIDDLE, CONTEXT_PROMPT_SUFFIX = _CONTEXT_PROMPT_REST.split("{query_str}")
+
+    IMPROVEMENT_PROMPT_TEMPLATE = """Goal: Analyze the current coffee preparation parameters and provide specific suggestions for improvement, focusing on addressing the reported issue.
 
-    Context:
-    ---------------------
-    {context_str}
-    ---------------------
+Return Format:
+Your response should be structured as follows:
+1. Issue Analysis (2-3 sentences identifying likely causes)
+2. Key Recommendations (3-5 bullet points)
+3. Detailed Adjustments (specific parameter changes)
+4. Additional Tips (if relevant)
 
-    Query: {query_str}
-    Answer: """
+Warnings:
+- Focus on the most impactful changes first
+- Be specific with measurements and adjustments
+- Explain the reasoning behind each recommendation
+- Reference sources when using contextual information
 
-    def __init__(self, max_whole_files: int = None, similarity_field: str = "chunks"):
+Current Parameters:
+{params_str}
+
+Additional Context:
+{context_str}"""
+    IMPROVEMENT_PROMPT_PREFIX, _IMPROVEMENT_PROMPT_REST = IMPROVEMENT_PROMPT_TEMPLATE.split("{params_str}")
+    IMPROVEMENT_PROMPT_MIDDLE = _IMPROVEMENT_PROMPT_REST.split("{context_str}")[0]
+
+    BATCH_PROMPT_TEMPLATE = """Goal: Answer each of the numbered coffee-related questions below using both the provided context and barista expertise.
+
+Return Format:
+Answer every question in order. Start each answer on a new line prefixed with its label, e.g. "A1:", "A2:".
+Each answer should give a direct answer (2-3 sentences) followed by practical tips if applicable.
+
+Warnings:
+- Answer every question, even if no context is available for it
+- Do not merge answers or skip labels
+- Stick to factual information from the context when available
+
+Questions:
+{questions_str}"""
+    BATCH_PROMPT_PREFIX = BATCH_PROMPT_TEMPLATE.split("{questions_str}")[0]
+
+    BATCH_ANSWER_PATTERN = re.compile(r'^\s*A(\d+):', re.MULTILINE)
+
+    def __init__(self, max_whole_files: int = None, similarity_field: str = "chunks",
+                 encoder=None, client: OpenAI = None):
         """Initialize the GuaxinimBot with API key validation and OpenAI client setup.
         
         Args:
@@ -124,22 +239,98 @@ You are a professional barista with years of experience teaching beginners. Your
                                            Defaults to DEFAULT_MAX_WHOLE_FILES if not specified.
             similarity_field (str, optional): Field to use for similarity search ('chunks' or 'summary').
                                            Defaults to 'chunks'.
+            encoder (SentenceTransformer, optional): Preloaded encoder for the document searcher.
+                                           A new one is loaded if not specified.
+            client (OpenAI, optional): Shared OpenAI client. A new one is created if not specified.
         """
-        api_key = get_env_var("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError(
-                "OpenAI API key not found. Please set the OPENAI_API_KEY environment variable."
-            )
-        os.environ["OPENAI_API_KEY"] = api_key  # Set for OpenAI client
-        self.client = OpenAI()
+        load_openai_api_key()
+        self.client = client or OpenAI(http_client=get_shared_http_client(), max_retries=MAX_RETRIES)
         self.max_whole_files = max_whole_files or self.DEFAULT_MAX_WHOLE_FILES
         self.similarity_field = similarity_field
+        self.encoder = encoder
+
+        # Memoize retrieval per instance so repeated queries skip the search
+        self._retrieve = lru_cache(maxsize=self.RETRIEVAL_CACHE_SIZE)(self._search_documents)
+        # Memoize prompt formatting of retrieved chunks without touching the shared result dicts
+        self._format_document = lru_cache(maxsize=self.FORMAT_CACHE_SIZE)(self._build_document_content)
+
+    @cached_property
+    def searcher(self) -> Union[DocumentSearcher, None]:
+        """Document searcher, loaded on first use and shared by bots using the same encoder."""
         try:
-            self.searcher = DocumentSearcher()
+            searcher = get_shared_searcher(self.encoder)
             logger.info("Document searcher initialized successfully")
+            return searcher
         except Exception as e:
             logger.warning(f"Could not initialize document searcher: {e}")
-            self.searcher = None
+            return None
+
+    @cached_property
+    def semantic_cache(self) -> Union[SemanticCache, None]:
+        """Semantic response cache reusing the searcher's query encoder to match paraphrased questions.
+
+        None when the searcher or FAISS is unavailable, in which case responses are not semantically cached.
+        """
+        if not self.searcher or not SemanticCache.AVAILABLE:
+            return None
+        return SemanticCache(
+            self.searcher.query_encoder,
+            value_type=GuaxinimResponse,
+            threshold=self.SEMANTIC_CACHE_THRESHOLD,
+            ttl_days=self.SEMANTIC_CACHE_TTL_DAYS
+        )
+
+    @contextmanager
+    def streaming(self, on_text: Callable[[str], None]) -> Iterator[None]:
+        """Stream answers generated inside the block.
+
+        Answers are still returned as complete GuaxinimResponse objects (and cached as
+        usual); on_text additionally receives each piece of text as it is generated.
+        Cached answers are returned immediately without calling on_text.
+
+        Args:
+            on_text (Callable[[str], None]): Called with each newly generated piece of text
+        """
+        token = _stream_callback.set(on_text)
+        try:
+            yield
+        finally:
+            _stream_callback.reset(token)
+
+    def _complete(self, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        """Run a chat completion, streaming it when called inside streaming().
+
+        Transient failures are retried with backoff by the client (MAX_RETRIES), and
+        requests wait for one of the process-wide request slots.
+
+        Returns:
+            str: The full generated answer
+        """
+        on_text = _stream_callback.get()
+        with request_slots:
+            if on_text is None:
+                response = self.client.chat.completions.create(
+                    model=self.GPT_MODEL,
+                    messages=messages,
+                    temperature=self.TEMPERATURE,
+                    max_tokens=max_tokens,
+                )
+                return response.choices[0].message.content
+
+            parts = []
+            stream = self.client.chat.completions.create(
+                model=self.GPT_MODEL,
+                messages=messages,
+                temperature=self.TEMPERATURE,
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            for chunk in stream:
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    parts.append(text)
+                    on_text(text)
+            return "".join(parts)
 
     @persistent_cache(ttl_days=30)
     def get_coffee_guide(self, method: str, rag_return_type: str = "chunks") -> GuaxinimResponse:
@@ -160,23 +351,18 @@ You are a professional barista with years of experience teaching beginners. Your
             context_str = ""
             
             if self.searcher:
-                logger.info(f"Searching for relevant context with query: {query}")
+                logger.info("Searching for relevant context with query: %s", query)
                 context_str, sources = self._get_relevant_context(query, rag_return_type=rag_return_type)
 
             # Create the prompt with main guide content first, then add context if available
-            prompt = self.COFFEE_GUIDE_PROMPT.format(method=method)
+            prompt = method.join(self.COFFEE_GUIDE_PROMPT_PARTS)
             if context_str:
                 prompt += f"\n\nAdditional Context:\n{context_str}"
 
-            response = self.client.chat.completions.create(
-                model=self.GPT_MODEL,
-                messages=[{"role": "system", "content": prompt}],
-                temperature=self.TEMPERATURE,
-                max_tokens=1000,
-            )
+            answer = self._complete([{"role": "system", "content": prompt}], max_tokens=1000)
 
             return GuaxinimResponse(
-                answer=response.choices[0].message.content,
+                answer=answer,
                 sources=sources
             )
         except Exception as e:
@@ -184,6 +370,106 @@ You are a professional barista with years of experience teaching beginners. Your
             logger.error(error_msg)
             return GuaxinimResponse.error(error_msg)
 
+    def warm_guides(self, methods: Tuple[str, ...] = None, rag_return_type: str = "chunks") -> List[Future]:
+        """Pre-compute cached brewing guides in the background.
+
+        Guides already cached are cheap cache hits, so this can run whenever a bot is created.
+
+        Args:
+            methods (Tuple[str, ...], optional): Brewing methods to warm. Defaults to SUPPORTED_METHODS.
+            rag_return_type (str): Type of context the guides are generated with
+
+        Returns:
+            List[Future]: One future per method, resolving to its GuaxinimResponse
+        """
+        return [
+            warmup_executor.submit(self.get_coffee_guide, method, rag_return_type=rag_return_type)
+            for method in (methods or self.SUPPORTED_METHODS)
+        ]
+
+    def _search_documents(self, query: str, k_chunks: int) -> Tuple[Tuple[Dict, ...], Tuple[Dict, ...]]:
+        """Search the document database for a query.
+
+        Memoized per instance as _retrieve, so repeated queries skip the search.
+
+        Args:
+            query (str): The search query
+            k_chunks (int): Number of chunks (or summaries) to retrieve
+
+        Returns:
+            Tuple[Tuple[Dict, ...], Tuple[Dict, ...]]: Main results and related title results
+                scoring above SIMILARITY_THRESHOLD
+        """
+        logger.info("Starting context search for query: %s", query)
+        
+        # Get relevant documents based on similarity field
+        if self.similarity_field == "chunks":
+            logger.info("Searching for relevant chunks")
+            # Search chunks and related titles with a single query embedding
+            search_results = self.searcher.search(
+                query, {'chunk': k_chunks, 'title': 2}, min_score=self.SIMILARITY_THRESHOLD
+            )
+            results = search_results['chunk']
+            title_results = search_results['title']
+        else:  # summary mode
+            logger.info("Searching for relevant summaries with k=%d", k_chunks)
+            # Search by summary first
+            results = self.searcher.search_similar_summaries(query, k=k_chunks, min_score=self.SIMILARITY_THRESHOLD)
+            title_results = results  # Use the same results for titles in summary mode
+
+        return tuple(results), tuple(title_results)
+
+    @staticmethod
+    def _first_by(results, field: str) -> Dict[str, Dict]:
+        """Keep the first result for each value of a field, in result order."""
+        unique = {}
+        for result in results:
+            unique.setdefault(result[field], result)
+        return unique
+
+    def _format_document_content(self, result: Dict) -> str:
+        """Format a retrieved chunk or summary with its document context for the prompt.
+
+        Memoized per instance by the result's fields, so results repeated across queries are formatted once.
+        """
+        return self._format_document(
+            result['title'],
+            result.get('chunk_text') or result.get('summary', ''),
+            result.get('full_text', ''),
+            tuple(result.get('tags') or ()),
+            result['source']
+        )
+
+    def _build_document_content(self, title: str, relevant_section: str, full_text: str,
+                                tags: Tuple[str, ...], source: str) -> str:
+        """Build the prompt text for a retrieved chunk or summary."""
+        parts = [f"From '{title}':\n"]
+        
+        # Add relevant section if available (chunk text or summary)
+        if relevant_section:
+            parts.append(f"Relevant section: {relevant_section}\n")
+        
+        # Add document context if available
+        if full_text:
+            ellipsis = '...' if len(full_text) > self.PREVIEW_LENGTH else ''
+            parts.append(f"Document context: {full_text[:self.PREVIEW_LENGTH]}{ellipsis}\n")
+        
+        # Add tags if available
+        if tags:
+            parts.append(f"Tags: {', '.join(tags)}\n")
+        
+        parts.append(f"(Source: {source})\n")
+        return ''.join(parts)
+
+    @staticmethod
+    def _format_title(title: Dict) -> str:
+        """Format a related article title for the prompt."""
+        parts = [f"Additional relevant article: {title['title']}\n"]
+        if title.get('tags'):
+            parts.append(f"Tags: {', '.join(title['tags'])}\n")
+        parts.append(f"(Source: {title['source']})\n")
+        return ''.join(parts)
+
     def _get_relevant_context(self, query: str, k_chunks: int = 5, rag_return_type: str = "chunks") -> tuple[str, list]:
         """Get relevant context from the document database.
         
@@ -199,102 +485,48 @@ You are a professional barista with years of experience teaching beginners. Your
             logger.warning("Document searcher not available, proceeding without context")
             return "", []
 
-        logger.info("Starting context search")
-        logger.info(f"Query: {query}")
-        
-        # Get relevant documents based on similarity field
-        if self.similarity_field == "chunks":
-            logger.info("Searching for relevant chunks")
-            # Search by chunks first, then get related titles
-            results = self.searcher.search_similar_chunks(query, k=k_chunks)
-            title_results = self.searcher.search_similar_titles(query, k=2)
-        else:  # summary mode
-            logger.info(f"Searching for relevant summaries with k={k_chunks}")
-            # Search by summary first
-            results = self.searcher.search_similar_summaries(query, k=k_chunks)
-            title_results = results  # Use the same results for titles in summary mode
+        results, title_results = self._retrieve(query, k_chunks)
 
-        # Early return if no results found
-        if not results:
+        # Early return if no relevant results found
+        if not results and not title_results:
             logger.warning("No relevant documents found")
             return "", []
 
-        # Format context string and collect sources
-        context_parts = []
-        sources = []
-        seen_sources = set()
-
-        # Helper function to add a source
-        def add_source(result):
-            if result['source'] not in seen_sources and result.get('similarity_score', 0) > self.SIMILARITY_THRESHOLD:
-                sources.append({
-                    'title': result['title'],
-                    'url': result['source'],
-                    'tags': result.get('tags', [])
-                })
-                seen_sources.add(result['source'])
-
-        # Helper function to format document content
-        def format_document_content(result):
-            parts = [f"From '{result['title']}':\n"]
-            
-            # Add relevant section if available (chunk text or summary)
-            relevant_section = result.get('chunk_text') or result.get('summary', '')
-            if relevant_section:
-                parts.append(f"Relevant section: {relevant_section}\n")
-            
-            # Add document context if available
-            if result.get('full_text'):
-                context = result['full_text'][:self.PREVIEW_LENGTH] + '...' if len(result['full_text']) > self.PREVIEW_LENGTH else result['full_text']
-                parts.append(f"Document context: {context}\n")
-            
-            # Add tags if available
-            if result.get('tags'):
-                parts.append(f"Tags: {', '.join(result['tags'])}\n")
-            
-            parts.append(f"(Source: {result['source']})\n")
-            return ''.join(parts)
-
-        # Process results based on mode
+        # Process results based on mode, keeping the result each context part was built from
         if rag_return_type == "whole file":
-            seen_titles = set()
-            for result in results:
-                if len(seen_titles) >= self.max_whole_files:
-                    break
-                    
-                if result['title'] not in seen_titles and result.get('similarity_score', 0) > self.SIMILARITY_THRESHOLD:
-                    # Add the full text of the document
-                    context_parts.append(
-                        f"From '{result['title']}':\n"
-                        f"{result.get('full_text', '')}\n"
-                        f"(Source: {result['source']})\n"
-                    )
-                    add_source(result)
-                    seen_titles.add(result['title'])
+            # The full text of the first results from distinct documents
+            by_title = self._first_by(results, 'title')
+            part_results = list(by_title.values())[:self.max_whole_files]
+            context_parts = [
+                f"From '{result['title']}':\n"
+                f"{result.get('full_text', '')}\n"
+                f"(Source: {result['source']})\n"
+                for result in part_results
+            ]
         else:  # chunks or summary mode
-            # Add relevant chunks/summaries with their context
-            for result in results:
-                if result.get('similarity_score', 0) > self.SIMILARITY_THRESHOLD:
-                    context_parts.append(format_document_content(result))
-                    add_source(result)
-
-            # Add relevant titles if they're different from existing sources
-            for title in title_results:
-                if title.get('similarity_score', 0) > self.SIMILARITY_THRESHOLD and title['source'] not in seen_sources:
-                    parts = [f"Additional relevant article: {title['title']}\n"]
-                    
-                    # Add tags if available
-                    if title.get('tags'):
-                        parts.append(f"Tags: {', '.join(title['tags'])}\n")
-                        
-                    parts.append(f"(Source: {title['source']})\n")
-                    context_parts.append(''.join(parts))
-                    add_source(title)
+            # Relevant chunks/summaries with their context, then related titles from other sources
+            by_source = self._first_by(results, 'source')
+            new_titles = self._first_by((t for t in title_results if t['source'] not in by_source), 'source')
+            part_results = list(results) + list(new_titles.values())
+            context_parts = (
+                [self._format_document_content(result) for result in results]
+                + [self._format_title(title) for title in new_titles.values()]
+            )
+
+        # Keep the most relevant parts that fit in the context token budget
+        context_parts = pack_to_budget(context_parts, self.CONTEXT_TOKEN_BUDGET, self.GPT_MODEL)
+
+        # Cite only the documents whose parts made it into the context
+        sources = [
+            {'title': result['title'], 'url': source, 'tags': result.get('tags', [])}
+            for source, result in self._first_by(part_results[:len(context_parts)], 'source').items()
+        ]
 
         # Always return sources even if no context was added
         return "\n".join(context_parts), sources
 
     @persistent_cache(ttl_days=30)
+    @semantic_cached("ask_guaxinim", lambda arguments: arguments['query'])
     def ask_guaxinim(self, query: str, rag_return_type: str = "chunks") -> GuaxinimResponse:
         """
         Process a coffee-related question and return an AI-generated answer along with sources.
@@ -308,34 +540,26 @@ You are a professional barista with years of experience teaching beginners. Your
         """
         try:
             # Get relevant context
-            logger.debug(f"Processing query: {query}")
+            logger.debug("Processing query: %s", query)
             context_str, sources = self._get_relevant_context(query, rag_return_type=rag_return_type)
             
             # Prepare the prompt
             if context_str:
                 logger.debug("Using context-based prompt")
-                prompt = self.CONTEXT_PROMPT_TEMPLATE.format(
-                    context_str=context_str,
-                    query_str=query
-                )
             else:
                 logger.debug("Using fallback prompt without context")
-                # Use a simplified version of CONTEXT_PROMPT_TEMPLATE without context section
-                prompt = self.CONTEXT_PROMPT_TEMPLATE.format(
-                    context_str="No additional context available.",
-                    query_str=query
-                )
+                context_str = "No additional context available."
+            prompt = (
+                self.CONTEXT_PROMPT_PREFIX + context_str
+                + self.CONTEXT_PROMPT_MIDDLE + query
+                + self.CONTEXT_PROMPT_SUFFIX
+            )
             
 
-            response = self.client.chat.completions.create(
-                model=self.GPT_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=self.TEMPERATURE,
-                max_tokens=800,
-            )
+            answer = self._complete([{"role": "user", "content": prompt}], max_tokens=800)
             
             return GuaxinimResponse(
-                answer=response.choices[0].message.content,
+                answer=answer,
                 sources=sources
             )
         except Exception as e:
@@ -343,7 +567,167 @@ You are a professional barista with years of experience teaching beginners. Your
             logger.error(error_msg)
             return GuaxinimResponse.error(str(e))
 
-    @persistent_cache(ttl_days=30)
+    def ask_guaxinim_stream(self, query: str, rag_return_type: str = "chunks") -> Generator[str, None, GuaxinimResponse]:
+        """
+        Yield the answer to a coffee-related question as it is generated.
+
+        The question is answered by ask_guaxinim in a worker thread, so caching applies as
+        usual; a cached answer is yielded in one piece. Errors are yielded as text.
+
+        Args:
+            query (str): The user's coffee-related question
+            rag_return_type (str): Type of context to return ('chunks' or 'whole file')
+
+        Returns:
+            GuaxinimResponse: The complete response, as the generator's return value
+        """
+        pieces = queue.Queue()
+        done = object()
+        result = {}
+
+        def answer():
+            try:
+                with self.streaming(pieces.put):
+                    result['response'] = self.ask_guaxinim(query, rag_return_type=rag_return_type)
+            finally:
+                pieces.put(done)
+
+        threading.Thread(target=answer, name="guaxinim-stream", daemon=True).start()
+        streamed = False
+        while (piece := pieces.get()) is not done:
+            streamed = True
+            yield piece
+
+        response = result.get('response') or GuaxinimResponse.error("No response generated")
+        if response.is_error:
+            yield ("\n\n" if streamed else "") + response.answer
+        elif not streamed:
+            yield response.answer
+        return response
+
+    def ask_guaxinim_batch(self, queries: List[str], rag_return_type: str = "chunks") -> List[GuaxinimResponse]:
+        """
+        Answer several coffee-related questions with a single OpenAI call.
+
+        Args:
+            queries (List[str]): The user's coffee-related questions
+            rag_return_type (str): Type of context to return ('chunks' or 'whole file')
+
+        Returns:
+            List[GuaxinimResponse]: One response per query, in the same order. Falls back to
+                answering each question individually if the batched answer cannot be parsed.
+        """
+        if len(queries) <= 1:
+            return [self.ask_guaxinim(query, rag_return_type=rag_return_type) for query in queries]
+
+        # Look up every question in the ask_guaxinim cache with a single round-trip
+        ask_cache = self.ask_guaxinim
+        cache_keys = [ask_cache.cache_key(self, query, rag_return_type=rag_return_type) for query in queries]
+        responses = ask_cache.get_many(cache_keys)
+        missing = [i for i, response in enumerate(responses) if response is None]
+        if not missing:
+            return responses
+
+        answered = self._answer_batch([queries[i] for i in missing], rag_return_type)
+        ask_cache.set_many({
+            cache_keys[i]: response
+            for i, response in zip(missing, answered)
+            if not response.is_error
+        })
+        for i, response in zip(missing, answered):
+            responses[i] = response
+        return responses
+
+    def _answer_batch(self, queries: List[str], rag_return_type: str) -> List[GuaxinimResponse]:
+        """Answer several questions with a single OpenAI call, bypassing the cache."""
+        if len(queries) == 1:
+            return [self.ask_guaxinim(queries[0], rag_return_type=rag_return_type)]
+
+        try:
+            question_parts = []
+            all_sources = []
+            # Retrieve all contexts concurrently; the searcher encodes the queries in one batch
+            contexts = retrieval_executor.map(
+                lambda query: self._get_relevant_context(query, rag_return_type=rag_return_type), queries
+            )
+            for i, (query, (context_str, sources)) in enumerate(zip(queries, contexts), 1):
+                question_parts.append(
+                    f"Q{i}: {query}\n"
+                    f"Context for Q{i}:\n{context_str or 'No additional context available.'}\n"
+                )
+                all_sources.append(sources)
+
+            prompt = self.BATCH_PROMPT_PREFIX + "\n".join(question_parts)
+            with request_slots:
+                response = self.client.chat.completions.create(
+                    model=self.GPT_MODEL,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=self.TEMPERATURE,
+                    max_tokens=800 * len(queries),
+                )
+
+            answers = self._parse_batch_answers(response.choices[0].message.content, len(queries))
+            if answers is None:
+                logger.warning("Could not parse batched answers, answering questions individually")
+                return [self.ask_guaxinim(query, rag_return_type=rag_return_type) for query in queries]
+
+            return [
+                GuaxinimResponse(answer=answer, sources=sources)
+                for answer, sources in zip(answers, all_sources)
+            ]
+        except Exception as e:
+            error_msg = f"Error processing questions: {str(e)}"
+            logger.error(error_msg)
+            return [GuaxinimResponse.error(str(e)) for _ in queries]
+
+    def _parse_batch_answers(self, response_text: str, expected: int) -> Union[List[str], None]:
+        """Split a batched response into its labeled answers.
+
+        Returns:
+            Union[List[str], None]: The answers in order, or None if any label is missing
+        """
+        matches = list(self.BATCH_ANSWER_PATTERN.finditer(response_text))
+        answers = {}
+        for match, next_match in zip(matches, matches[1:] + [None]):
+            end = next_match.start() if next_match else len(response_text)
+            answers[int(match.group(1))] = response_text[match.end():end].strip()
+
+        if sorted(answers) != list(range(1, expected + 1)):
+            return None
+        return [answers[i] for i in range(1, expected + 1)]
+
+    async def get_coffee_guide_async(self, method: str, rag_return_type: str = "chunks") -> GuaxinimResponse:
+        """Async variant of get_coffee_guide, run in a worker thread so calls can be gathered."""
+        return await asyncio.to_thread(self.get_coffee_guide, method, rag_return_type=rag_return_type)
+
+    async def ask_guaxinim_async(self, query: str, rag_return_type: str = "chunks") -> GuaxinimResponse:
+        """Async variant of ask_guaxinim, run in a worker thread so calls can be gathered."""
+        return await asyncio.to_thread(self.ask_guaxinim, query, rag_return_type=rag_return_type)
+
+    async def improve_coffee_async(self, coffee_data: CoffeePreparationData,
+                                   rag_return_type: str = "chunks") -> GuaxinimResponse:
+        """Async variant of improve_coffee, run in a worker thread so calls can be gathered."""
+        return await asyncio.to_thread(self.improve_coffee, coffee_data, rag_return_type=rag_return_type)
+
+    @classmethod
+    def format_coffee_parameters(cls, coffee_data: CoffeePreparationData) -> str:
+        """Format preparation parameters one per line, skipping optional ones that are not provided."""
+        # Start with required parameters, then add optional ones only if they are provided
+        params = [
+            f"Issue: {coffee_data.issue_encountered}",
+            f"Brewing method: {coffee_data.brewing_method}",
+            f"Coffee amount: {coffee_data.amount_of_coffee}g",
+            f"Water amount: {coffee_data.amount_of_water}ml",
+        ]
+        params += [
+            f"{label}: {value}{unit}"
+            for attr, label, unit in cls.OPTIONAL_PARAMETERS
+            if (value := getattr(coffee_data, attr))
+        ]
+        return "\n".join(params)
+
+    # Key cached suggestions on bucketed parameters so small measurement differences share them
+    @persistent_cache(ttl_days=30, normalizers={'coffee_data': CoffeePreparationData.cache_bucket})
     def improve_coffee(self, coffee_data: CoffeePreparationData, rag_return_type: str = "chunks") -> GuaxinimResponse:
         """
         Analyze current coffee preparation parameters and suggest improvements.
@@ -356,31 +740,7 @@ You are a professional barista with years of experience teaching beginners. Your
             GuaxinimResponse: Object containing the suggestions and sources
         """
         try:
-            # Start with required parameters
-            params = [
-                f"Issue: {coffee_data.issue_encountered}",
-                f"Brewing method: {coffee_data.brewing_method}",
-                f"Coffee amount: {coffee_data.amount_of_coffee}g",
-                f"Water amount: {coffee_data.amount_of_water}ml",
-            ]
-            
-            # Add optional parameters only if they are provided
-            if coffee_data.type_of_bean:
-                params.append(f"Bean type: {coffee_data.type_of_bean}")
-            if coffee_data.total_extraction_time:
-                params.append(f"Extraction time: {coffee_data.total_extraction_time}s")
-            if coffee_data.water_temperature:
-                params.append(f"Water temp: {coffee_data.water_temperature}°C")
-            if coffee_data.grinder_granularity:
-                params.append(f"Grind size: {coffee_data.grinder_granularity}")
-            if coffee_data.bloom_time:
-                params.append(f"Bloom time: {coffee_data.bloom_time}s")
-            if coffee_data.number_of_pours:
-                params.append(f"Number of pours: {coffee_data.number_of_pours}")
-            if coffee_data.amount_in_each_pour:
-                params.append(f"Amount per pour: {coffee_data.amount_in_each_pour}ml")
-            if coffee_data.notes:
-                params.append(f"Additional notes: {coffee_data.notes}")
+            params_str = self.format_coffee_parameters(coffee_data)
 
             # Get relevant context about the issue and brewing method
             query = f"How to fix {coffee_data.issue_encountered} in {coffee_data.brewing_method} coffee"
@@ -391,35 +751,14 @@ You are a professional barista with years of experience teaching beginners. Your
                 context_str, sources = self._get_relevant_context(query, rag_return_type=rag_return_type)
 
             # Create the improvement prompt
-            improvement_prompt = f"""Goal: Analyze the current coffee preparation parameters and provide specific suggestions for improvement, focusing on addressing the reported issue.            
-
-            Return Format:
-            Your response should be structured as follows:
-            1. Issue Analysis (2-3 sentences identifying likely causes)
-            2. Key Recommendations (3-5 bullet points)
-            3. Detailed Adjustments (specific parameter changes)
-            4. Additional Tips (if relevant)
-
-            Warnings:
-            - Focus on the most impactful changes first
-            - Be specific with measurements and adjustments
-            - Explain the reasoning behind each recommendation
-            - Reference sources when using contextual information
-
-            Current Parameters:
-            {"\n".join(params)}
-
-            Additional Context:
-            {context_str if context_str else "No additional context available."}"""
-
-            response = self.client.chat.completions.create(
-                model=self.GPT_MODEL,
-                messages=[{"role": "user", "content": improvement_prompt}],
-                temperature=self.TEMPERATURE,
-                max_tokens=1000
+            improvement_prompt = (
+                self.IMPROVEMENT_PROMPT_PREFIX + params_str
+                + self.IMPROVEMENT_PROMPT_MIDDLE + (context_str or "No additional context available.")
             )
+
+            answer = self._complete([{"role": "user", "content": improvement_prompt}], max_tokens=1000)
             return GuaxinimResponse(
-                answer=response.choices[0].message.content,
+                answer=answer,
                 sources=sources
             )
         except Exception as e:
@@ -2,8 +2,10 @@
 Logging configuration for the Guaxinim application.
 """
 
+import atexit
 import logging
 import sys
+from logging.handlers import MemoryHandler
 
 # Create logger
 logger = logging.getLogger('guaxinim')
@@ -24,6 +26,10 @@ file_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(mess
 console_handler.setFormatter(console_format)
 file_handler.setFormatter(file_format)
 
+# Buffer file records and write them in batches, flushing at once on warnings and at exit
+buffered_file_handler = MemoryHandler(capacity=1000, flushLevel=logging.WARNING, target=file_handler)
+atexit.register(buffered_file_handler.flush)
+
 # Add the handlers to the logger
 logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+logger.addHandler(buffered_file_handler)
@@ -0,0 +1,65 @@
+"""
+OpenAI Client Module
+Provides a pooled HTTP client so OpenAI calls reuse connections instead of
+opening a new TCP/TLS session per request.
+"""
+
+import atexit
+import threading
+import httpx
+from guaxinim.core.logger import logger
+
+# Connection pool configuration
+MAX_CONNECTIONS = 32
+MAX_KEEPALIVE_CONNECTIONS = 16
+TIMEOUT_SECONDS = 60
+CONNECT_TIMEOUT_SECONDS = 5
+
+# Retries with exponential backoff done by the OpenAI SDK for connection errors, 429s and 5xx
+MAX_RETRIES = 6
+
+# Header in which the OpenAI SDK sends how many times a request has already been retried
+RETRY_COUNT_HEADER = 'x-stainless-retry-count'
+
+# Maximum OpenAI requests in flight per process, kept below the account rate limits
+MAX_CONCURRENT_REQUESTS = 16
+request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+
+def log_retry(request: httpx.Request) -> None:
+    """Log a warning when the OpenAI SDK resends a request after a transient failure."""
+    try:
+        retries_taken = int(request.headers.get(RETRY_COUNT_HEADER, 0))
+    except ValueError:
+        return
+    if retries_taken:
+        logger.warning(f"🔁 Retrying OpenAI request to {request.url.path} (retry {retries_taken} of {MAX_RETRIES})")
+
+
+def create_http_client() -> httpx.Client:
+    """Create an HTTP/2 client with a pooled, keep-alive connection limit."""
+    return httpx.Client(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+        ),
+        timeout=httpx.Timeout(TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS),
+        event_hooks={'request': [log_retry]}
+    )
+
+
+_shared_http_client = None
+_shared_http_client_lock = threading.Lock()
+
+
+def get_shared_http_client() -> httpx.Client:
+    """Get the process-wide HTTP client, so every OpenAI client shares one connection pool."""
+    global _shared_http_client
+    if _shared_http_client is None:
+        with _shared_http_client_lock:
+            if _shared_http_client is None:
+                _shared_http_client = create_http_client()
+                # Close pooled connections cleanly when the process exits
+                atexit.register(_shared_http_client.close)
+    return _shared_http_client
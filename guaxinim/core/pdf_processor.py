@@ -1,54 +1,61 @@
 """Module for processing PDF documents and generating summaries."""
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
-import PyPDF2
+from typing import Dict, List, Optional, Tuple
+import pymupdf
 from .base_processor import BaseProcessor
 
+def _extract_pdf_content_safe(file_path: Path) -> Tuple[Path, Optional[str], Optional[str]]:
+    """Extract a PDF's text in a worker process, returning the error message instead of raising."""
+    try:
+        return file_path, PDFProcessor.extract_pdf_content(str(file_path)), None
+    except Exception as e:
+        return file_path, None, str(e)
+
 class PDFProcessor(BaseProcessor):
     """Process PDF documents and generate summaries."""
 
-    def __init__(self):
-        """Initialize the PDF processor."""
+    def __init__(self, max_workers: Optional[int] = None):
+        """Initialize the PDF processor.
+
+        Args:
+            max_workers (int, optional): Number of workers used to extract and summarize documents.
+                                         Defaults to the executor's own default.
+        """
         super().__init__(
             input_dir='data/raw/pdfs',
             output_dir='data/raw/pdf_processed'
         )
+        self.max_workers = max_workers
 
-    def extract_pdf_content(self, pdf_path: str) -> str:
+    @staticmethod
+    def extract_pdf_content(pdf_path: str) -> str:
         """Extract text content from a PDF file."""
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ''
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-        return text
+        with pymupdf.open(pdf_path) as document:
+            return ''.join(page.get_text() for page in document)
 
     def process_pdf_file(self, file_path: Path) -> Dict:
         """Process a single PDF file."""
-        # Extract content
-        content = self.extract_pdf_content(str(file_path))
-        
+        return self.process_pdf_content(self.extract_pdf_content(str(file_path)))
+
+    def process_pdf_content(self, content: str) -> Dict:
+        """Process the extracted text of a PDF file."""
         # Split content into lines
         lines = content.split('\n')
         
         # Get title (first line)
         title = lines[0].strip() if lines else "Untitled"
         
-        # Find source and its line index
-        source = ""
-        source_line_index = -1
-        for i, line in enumerate(lines):
-            if "--source--" in line:
-                source = line.replace("--source--", "").strip()
-                source_line_index = i
-                break
-        
-        # Remove title and source line from content
+        # Find the source line, dropping it and the title from the content in one pass
+        source = None
         filtered_lines = []
-        for i, line in enumerate(lines):
-            if i != 0 and i != source_line_index:  # Skip title and source line
+        for line in lines[1:]:
+            if source is None and "--source--" in line:
+                source = line.replace("--source--", "").strip()
+            else:
                 filtered_lines.append(line)
+        source = source or ""
         
         # Join filtered content
         full_text = '\n'.join(filtered_lines)
@@ -76,10 +83,14 @@ class PDFProcessor(BaseProcessor):
         if not input_dir.exists():
             raise ValueError(f"No PDF directory found for folder: {folder_name}")
 
-        for file_path in input_dir.glob('*.pdf'):
+        file_paths = list(input_dir.glob('*.pdf'))
+        if not file_paths:
+            return
+
+        def process(file_path, content):
             try:
                 print(f"Processing {file_path.name}...")
-                processed_data = self.process_pdf_file(file_path)
+                processed_data = self.process_pdf_content(content)
                 
                 # Save processed data
                 output_file = f"{file_path.stem}.json"
@@ -87,3 +98,16 @@ class PDFProcessor(BaseProcessor):
             
             except Exception as e:
                 print(f"Error processing {file_path.name}: {str(e)}")
+
+        # Text extraction is CPU-bound, so PDFs are parsed in worker processes while the
+        # summaries, which wait on OpenAI, are requested from threads as each text arrives
+        with ProcessPoolExecutor(max_workers=self.max_workers) as extractors, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as summarizers:
+            futures = []
+            for file_path, content, error in extractors.map(_extract_pdf_content_safe, file_paths):
+                if error:
+                    print(f"Error processing {file_path.name}: {error}")
+                    continue
+                futures.append(summarizers.submit(process, file_path, content))
+            for future in futures:
+                future.result()
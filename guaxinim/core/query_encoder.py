@@ -0,0 +1,97 @@
+"""
+Query Encoder Module
+Micro-batches concurrent query embeddings so simultaneous requests share a
+single encoder call instead of each running its own forward pass.
+"""
+
+from concurrent.futures import Future
+from functools import lru_cache
+import queue
+import threading
+import time
+from typing import List, Tuple
+import numpy as np
+from guaxinim.core.logger import logger
+
+# Batching configuration
+MAX_BATCH_SIZE = 64
+MAX_WAIT_SECONDS = 0.01
+
+# Number of recent query embeddings kept, so repeated queries skip the model
+QUERY_CACHE_SIZE = 1024
+
+
+class BatchingQueryEncoder:
+    """
+    Collects queries submitted from any thread and encodes them in batches.
+
+    A background worker waits for the first pending query, then gathers more for
+    up to ``max_wait`` seconds (or until ``max_batch_size`` are queued) and encodes
+    the whole batch with one call to the model. Recent embeddings are kept in an
+    LRU cache keyed by query text.
+    """
+
+    def __init__(self, model, max_batch_size: int = MAX_BATCH_SIZE, max_wait: float = MAX_WAIT_SECONDS,
+                 cache_size: int = QUERY_CACHE_SIZE):
+        """Initialize the encoder and start its worker thread.
+
+        Args:
+            model: Sentence-transformer model used to embed the queries
+            max_batch_size (int): Maximum number of queries encoded in one call
+            max_wait (float): Seconds to wait for more queries once one is pending
+            cache_size (int): Number of recent query embeddings to keep
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._cached_encode = lru_cache(maxsize=cache_size)(self._encode_batched)
+        self._pending: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="guaxinim-query-encoder", daemon=True)
+        self._worker.start()
+
+    def encode(self, query: str) -> np.ndarray:
+        """Embed a query, blocking until its batch has been encoded.
+
+        Returns:
+            np.ndarray: The query embedding as a float32 row vector of shape (1, d).
+                Cached embeddings are shared between callers and must not be modified.
+        """
+        return self._cached_encode(query)
+
+    def _encode_batched(self, query: str) -> np.ndarray:
+        """Queue a query for the worker and wait for its embedding."""
+        future = Future()
+        self._pending.put((query, future))
+        return future.result()
+
+    def _next_batch(self) -> List[Tuple[str, Future]]:
+        """Block for the first pending query, then collect more until the batch is full or the wait expires."""
+        batch = [self._pending.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        """Worker loop encoding pending queries batch by batch."""
+        while True:
+            batch = self._next_batch()
+            queries = [query for query, _ in batch]
+            try:
+                embeddings = np.asarray(self.model.encode(queries), dtype=np.float32)
+            except Exception as e:
+                logger.error(f"Error encoding query batch: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            if len(batch) > 1:
+                logger.debug("Encoded %d queries in one batch", len(batch))
+            for i, (_, future) in enumerate(batch):
+                future.set_result(embeddings[i:i + 1])
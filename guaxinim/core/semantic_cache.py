@@ -0,0 +1,242 @@
+"""
+Semantic Cache Module
+Caches responses by query meaning rather than exact text, so paraphrased
+questions can reuse a previous answer.
+"""
+
+from functools import wraps
+import hashlib
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import msgspec
+import numpy as np
+from guaxinim.core.cache import cache_bypassed, redis_client, register_semantic_cache
+from guaxinim.core.logger import logger
+
+try:
+    import faiss
+except ImportError:  # FAISS is optional; without it responses are not semantically cached
+    faiss = None
+
+
+class SemanticCache:
+    """
+    An embedding-similarity cache backed by in-memory FAISS HNSW inner-product indexes
+    storing vectors in half precision.
+
+    Entries are grouped by namespace (e.g. method name and retrieval settings) so
+    answers produced under different settings are never mixed. Every entry is also
+    stored in a Redis hash so other processes can load it.
+    """
+
+    REDIS_PREFIX = "guaxinim:semantic:"
+
+    # Whether FAISS is installed, which the cache needs for its indexes
+    AVAILABLE = faiss is not None
+
+    # HNSW graph parameters: neighbors per node, build-time and query-time beam widths
+    HNSW_NEIGHBORS = 16
+    HNSW_EF_CONSTRUCTION = 200
+    HNSW_EF_SEARCH = 64
+
+    # Nearest entries checked per lookup, so an expired nearest entry does not hide a fresh one
+    SEARCH_K = 8
+
+    def __init__(self, encoder, value_type: Any = Any, threshold: float = 0.95, ttl_days: int = 7):
+        """Initialize the semantic cache.
+
+        Args:
+            encoder: Query encoder whose encode(query) returns a (1, d) embedding,
+                such as the document searcher's BatchingQueryEncoder
+            value_type: Type of the cached values, used to decode entries loaded from Redis
+            threshold (float): Minimum cosine similarity for a cached entry to be reused
+            ttl_days (int): Number of days a cached entry stays valid
+        """
+        self.encoder = encoder
+        self.threshold = threshold
+        self.ttl_seconds = ttl_days * 24 * 60 * 60
+        self.indexes: Dict[str, "faiss.IndexHNSWSQ"] = {}
+        self.values: Dict[str, List[Any]] = {}
+        self.created_at: Dict[str, List[float]] = {}
+        # FAISS indexes must not be searched while they are being added to
+        self._lock = threading.Lock()
+        self.encoder_msgpack = msgspec.msgpack.Encoder()
+        self.decoder_msgpack = msgspec.msgpack.Decoder(type=Tuple[bytes, float, value_type])
+        register_semantic_cache(self)
+
+    def embed(self, query: str) -> np.ndarray:
+        """Embed a query as a normalized float32 row vector."""
+        embedding = np.asarray(self.encoder.encode(query), dtype=np.float32).reshape(1, -1)
+        # Divide into a new array, since the encoder may return a shared cached embedding
+        return embedding / np.linalg.norm(embedding, axis=1, keepdims=True)
+
+    def get(self, namespace: str, embedding: np.ndarray, threshold: Optional[float] = None) -> Optional[Any]:
+        """Return the cached value closest to the embedding if it is similar enough.
+
+        Args:
+            namespace (str): Namespace to search
+            embedding (np.ndarray): Normalized query embedding from embed()
+            threshold (float, optional): Minimum similarity, overriding the cache default
+        """
+        threshold = self.threshold if threshold is None else threshold
+        with self._lock:
+            index = self._get_index(namespace, embedding.shape[1])
+            if index.ntotal == 0:
+                return None
+
+            similarities, indices = index.search(embedding, min(self.SEARCH_K, index.ntotal))
+            value = None
+            found_expired = False
+            for similarity, position in zip(similarities[0], indices[0]):
+                if position < 0 or similarity < threshold:
+                    break
+                if self._expired(self.created_at[namespace][position]):
+                    found_expired = True
+                    continue
+                value = self.values[namespace][position]
+                break
+
+            if found_expired:
+                # HNSW indexes cannot remove entries, so rebuild the namespace without the expired ones
+                self._reload(namespace, embedding.shape[1])
+            if value is None:
+                return None
+
+        logger.info(f"✨ Using semantically cached response (similarity {similarity:.3f})")
+        return value
+
+    def clear(self) -> None:
+        """Drop every in-memory namespace, so entries are reloaded from Redis on next use."""
+        with self._lock:
+            self.indexes.clear()
+            self.values.clear()
+            self.created_at.clear()
+
+    def add(self, namespace: str, query: str, embedding: np.ndarray, value: Any) -> None:
+        """Add a value to the cache and persist it to Redis."""
+        created_at = time.time()
+        with self._lock:
+            self._get_index(namespace, embedding.shape[1]).add(embedding)
+            self.values[namespace].append(value)
+            self.created_at[namespace].append(created_at)
+
+        try:
+            field = hashlib.blake2b(query.encode('utf-8'), digest_size=16).hexdigest()
+            redis_client.hset(
+                self.REDIS_PREFIX + namespace,
+                field,
+                self.encoder_msgpack.encode((embedding.tobytes(), created_at, value))
+            )
+        except Exception as e:
+            logger.warning(f"Semantic cache write error: {e}")
+
+    def _get_index(self, namespace: str, dimension: int) -> "faiss.IndexHNSWSQ":
+        """Get the index for a namespace, loading persisted entries on first use."""
+        if namespace not in self.indexes:
+            # fp16 codes halve memory and need no training, unlike 8-bit codes, so entries can be added one by one
+            index = faiss.IndexHNSWSQ(
+                dimension, faiss.ScalarQuantizer.QT_fp16, self.HNSW_NEIGHBORS, faiss.METRIC_INNER_PRODUCT
+            )
+            index.hnsw.efConstruction = self.HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = self.HNSW_EF_SEARCH
+            self.indexes[namespace] = index
+            self.values[namespace] = []
+            self.created_at[namespace] = []
+            self._load(namespace)
+        return self.indexes[namespace]
+
+    def _reload(self, namespace: str, dimension: int) -> None:
+        """Rebuild a namespace's index from Redis, which drops its expired entries."""
+        del self.indexes[namespace], self.values[namespace], self.created_at[namespace]
+        self._get_index(namespace, dimension)
+
+    def _expired(self, created_at: float) -> bool:
+        """Whether an entry created at the given time is past its TTL."""
+        return time.time() - created_at > self.ttl_seconds
+
+    def _load(self, namespace: str) -> None:
+        """Load the entries persisted in Redis for a namespace, dropping expired ones."""
+        key = self.REDIS_PREFIX + namespace
+        try:
+            entries = redis_client.hgetall(key)
+        except Exception as e:
+            logger.warning(f"Semantic cache read error: {e}")
+            return
+
+        stale = []
+        embeddings = []
+        for field, data in entries.items():
+            try:
+                embedding_bytes, created_at, value = self.decoder_msgpack.decode(data)
+            except Exception as e:
+                logger.warning(f"Semantic cache decode error: {e}")
+                stale.append(field)
+                continue
+            if self._expired(created_at):
+                stale.append(field)
+                continue
+            embeddings.append(np.frombuffer(embedding_bytes, dtype=np.float32))
+            self.values[namespace].append(value)
+            self.created_at[namespace].append(created_at)
+
+        if embeddings:
+            # One add call lets FAISS encode and insert the whole batch in parallel
+            self.indexes[namespace].add(np.vstack(embeddings))
+
+        if stale:
+            try:
+                redis_client.hdel(key, *stale)
+            except Exception as e:
+                logger.warning(f"Semantic cache cleanup error: {e}")
+
+
+def semantic_cached(namespace: str, query_builder: Callable[[Dict[str, Any]], str],
+                    threshold: Optional[float] = None) -> Callable:
+    """
+    A decorator that serves a method from its instance's ``semantic_cache``.
+
+    The namespace is extended with the call's ``rag_return_type`` and the instance's
+    ``similarity_field`` and ``GPT_MODEL`` so answers built from different settings are kept apart.
+    Error responses (with a truthy ``is_error``) are not cached. Lookups are skipped while an
+    outer ``persistent_cache`` call runs with ``bypass_cache=True``.
+
+    Args:
+        namespace (str): Base namespace for the decorated method
+        query_builder (Callable): Builds the text to embed from the bound call arguments
+        threshold (float, optional): Minimum similarity, overriding the cache default
+
+    Returns:
+        Callable: The decorated method
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(self, *args, **kwargs) -> Any:
+            cache = self.semantic_cache
+            if cache is None:
+                return func(self, *args, **kwargs)
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+            full_namespace = (
+                f"{namespace}:{arguments.get('rag_return_type')}:{getattr(self, 'similarity_field', None)}"
+                f":{getattr(self, 'GPT_MODEL', None)}"
+            )
+            query = query_builder(arguments)
+
+            embedding = cache.embed(query)
+            if not cache_bypassed():
+                cached = cache.get(full_namespace, embedding, threshold)
+                if cached is not None:
+                    return cached
+
+            result = func(self, *args, **kwargs)
+            if not getattr(result, 'is_error', False):
+                cache.add(full_namespace, query, embedding, result)
+            return result
+        return wrapper
+    return decorator
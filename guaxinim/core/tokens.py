@@ -0,0 +1,87 @@
+"""
+Token Counting Module
+Counts prompt tokens so retrieved context can be packed into a fixed token budget.
+"""
+
+from functools import lru_cache
+from typing import List
+from guaxinim.core.logger import logger
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional; fall back to a character-based estimate
+    tiktoken = None
+
+# Approximate characters per token for English text, used without tiktoken
+CHARS_PER_TOKEN = 4
+
+# Contexts whose character-based estimate is under budget / ESTIMATE_MARGIN are kept without
+# tokenizing, leaving room for text that tokenizes worse than English
+ESTIMATE_MARGIN = 2
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str):
+    """Get the tiktoken encoding for a model, or None if it is unavailable."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception as e:
+        logger.warning(f"Could not load tokenizer for {model}, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Count the tokens in a text for a model."""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str) -> str:
+    """Cut a text down to at most max_tokens tokens."""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    return encoding.decode(encoding.encode(text)[:max_tokens])
+
+
+def pack_to_budget(parts: List[str], budget: int, model: str, separator: str = "\n") -> List[str]:
+    """Keep parts in order until adding the next one would exceed the token budget.
+
+    Parts should be ordered by relevance, and the budget covers them joined with
+    ``separator``. The first part is truncated rather than dropped if it exceeds the
+    budget on its own. Contexts far below the budget by a
+    character-based estimate are returned without being tokenized.
+
+    The kept parts are always a prefix of ``parts``, so ``parts[:len(packed)]`` are the
+    ones included.
+
+    Args:
+        parts (List[str]): Context parts, most relevant first
+        budget (int): Maximum number of tokens for all kept parts
+        model (str): Model whose tokenizer is used for counting
+        separator (str): Text the caller joins the kept parts with
+
+    Returns:
+        List[str]: The leading parts that fit within the budget
+    """
+    total_chars = sum(len(part) for part in parts) + len(separator) * max(len(parts) - 1, 0)
+    if total_chars // CHARS_PER_TOKEN * ESTIMATE_MARGIN <= budget:
+        return parts
+
+    separator_tokens = count_tokens(separator, model)
+    packed = []
+    total = 0
+    for part in parts:
+        tokens = count_tokens(part, model) + (separator_tokens if packed else 0)
+        if total + tokens > budget:
+            if not packed:
+                packed.append(truncate_to_tokens(part, budget, model))
+            logger.info("Context token budget reached, keeping %d of %d parts", len(packed), len(parts))
+            break
+        packed.append(part)
+        total += tokens
+    return packed
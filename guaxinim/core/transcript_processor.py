@@ -1,17 +1,26 @@
 """Module for processing YouTube video transcripts and generating summaries using OpenAI."""
-import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import openai
+import orjson
+from guaxinim.core.openai_client import MAX_RETRIES, get_shared_http_client
 
 class TranscriptProcessor:
     """Process YouTube transcripts and generate summaries using OpenAI."""
 
-    def __init__(self):
-        """Initialize the processor."""
+    def __init__(self, max_workers: Optional[int] = None):
+        """Initialize the processor.
+
+        Args:
+            max_workers (int, optional): Number of transcripts summarized concurrently.
+                                         Defaults to the executor's own default.
+        """
         self.base_input_dir = Path('data/raw/transcripts')
         self.base_output_dir = Path('data/raw/youtube_processed')
         self.base_output_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self.client = openai.OpenAI(http_client=get_shared_http_client(), max_retries=MAX_RETRIES)
 
     def merge_transcript(self, transcript: List[Dict]) -> str:
         """Merge transcript segments into a single text."""
@@ -37,7 +46,7 @@ class TranscriptProcessor:
                     - [tag4]
                     - [tag5]"""
 
-        response = openai.chat.completions.create(
+        response = self.client.chat.completions.create(
             model="gpt-3.5-turbo-16k",
             messages=[
                 {"role": "system", "content": "You are a helpful assistant that analyzes video transcripts and provides summaries and tags."},
@@ -57,8 +66,7 @@ class TranscriptProcessor:
 
     def process_transcript_file(self, file_path: Path) -> Dict:
         """Process a single transcript file."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = orjson.loads(file_path.read_bytes())
 
         # Merge transcript segments
         merged_text = self.merge_transcript(data['transcript'])
@@ -85,17 +93,20 @@ class TranscriptProcessor:
         if not input_dir.exists():
             raise ValueError(f"No transcript directory found for channel: {channel_name}")
 
-        for file_path in input_dir.glob('*.json'):
+        def process(file_path):
             try:
                 print(f"Processing {file_path.name}...")
                 processed_data = self.process_transcript_file(file_path)
                 
                 # Save processed data
                 output_file = output_dir / file_path.name
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(processed_data, f, indent=2, ensure_ascii=False)
+                output_file.write_bytes(orjson.dumps(processed_data, option=orjson.OPT_INDENT_2))
                 
                 print(f"Saved processed data to {output_file}")
             
             except Exception as e:
                 print(f"Error processing {file_path.name}: {str(e)}")
+
+        # Each file waits on its own OpenAI call, so summarize them from a thread pool
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(process, input_dir.glob('*.json')))
@@ -1,11 +1,17 @@
 """Module for crawling YouTube channels and extracting video transcripts."""
 import os
 import json
-import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Dict
 from dotenv import load_dotenv
+import orjson
+import requests
 from googleapiclient.discovery import build
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import TranscriptsDisabled
 
@@ -14,6 +20,21 @@ class YoutubeCrawler:
     
     Requires YOUTUBE_API_KEY to be set in the .env file.
     """
+
+    # Maximum number of video IDs accepted by one videos().list request
+    MAX_IDS_PER_REQUEST = 50
+
+    # Concurrent transcript downloads, and the fixed delay between starting them, which
+    # caps the crawler at five transcript requests per second
+    TRANSCRIPT_WORKERS = 8
+    REQUEST_INTERVAL_SECONDS = 0.2
+
+    # Channel IDs resolved by search are kept on disk, since each search costs 100 quota units
+    CHANNEL_ID_CACHE_FILE = '.channel_id_cache.json'
+    CHANNEL_ID_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+    # Characters removed from or replaced in video titles to make filenames
+    FILENAME_TRANSLATION = str.maketrans({**dict.fromkeys('<>:"/\\|?*'), ' ': '_'})
     
     def __init__(self, number_of_videos: int = 20):
         """Initialize the crawler using YouTube API key from environment variables."""
@@ -23,13 +44,49 @@ class YoutubeCrawler:
         if not api_key:
             raise ValueError('YOUTUBE_API_KEY not found in environment variables')
             
+        # The discovery client keeps its own connection alive between API calls
         self.youtube = build('youtube', 'v3', developerKey=api_key)
+        self.session = self.create_session()
+        self.transcript_api = YouTubeTranscriptApi(http_client=self.session)
         self.base_dir = Path('data/raw/transcripts')
         self.number_of_videos = number_of_videos
         
         # Create base directory if it doesn't exist
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.channel_id_cache_path = self.base_dir / self.CHANNEL_ID_CACHE_FILE
+        self.channel_id_cache = self.load_channel_id_cache()
     
+    def create_session(self) -> requests.Session:
+        """Create a session whose connection pool is shared by the concurrent transcript downloads."""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.TRANSCRIPT_WORKERS * 2,
+            pool_maxsize=self.TRANSCRIPT_WORKERS * 2,
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        )
+        session.mount('https://', adapter)
+        return session
+
+    def load_channel_id_cache(self) -> Dict[str, Dict]:
+        """Load the resolved channel IDs saved by previous runs."""
+        try:
+            with open(self.channel_id_cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Could not read channel ID cache: {str(e)}")
+            return {}
+
+    def save_channel_id_cache(self):
+        """Save the resolved channel IDs, replacing the cache file atomically."""
+        try:
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.base_dir, delete=False) as f:
+                json.dump(self.channel_id_cache, f)
+            os.replace(f.name, self.channel_id_cache_path)
+        except Exception as e:
+            print(f"Could not save channel ID cache: {str(e)}")
+
     def get_channel_id(self, channel_url: str) -> str:
         """Extract channel ID from various forms of YouTube channel URLs."""
         if 'youtube.com/channel/' in channel_url:
@@ -38,6 +95,11 @@ class YoutubeCrawler:
         # Handle custom URLs
         if 'youtube.com/c/' in channel_url or 'youtube.com/@' in channel_url:
             channel_name = channel_url.split('/')[-1].replace('@', '')
+            cache_key = channel_url.rstrip('/').lower()
+            cached = self.channel_id_cache.get(cache_key)
+            if cached and time.time() - cached['ts'] < self.CHANNEL_ID_CACHE_TTL_SECONDS:
+                return cached['id']
+
             request = self.youtube.search().list(
                 part='snippet',
                 q=channel_name,
@@ -46,7 +108,10 @@ class YoutubeCrawler:
             )
             response = request.execute()
             if response['items']:
-                return response['items'][0]['id']['channelId']
+                channel_id = response['items'][0]['id']['channelId']
+                self.channel_id_cache[cache_key] = {'id': channel_id, 'ts': time.time()}
+                self.save_channel_id_cache()
+                return channel_id
         
         raise ValueError("Could not extract channel ID from URL")
     
@@ -61,19 +126,23 @@ class YoutubeCrawler:
         )
         response = request.execute()
         
-        videos = []
-        for item in response['items']:
-            video_id = item['id']['videoId']
-            
-            # Get video statistics
+        video_ids = [item['id']['videoId'] for item in response['items']]
+
+        # Get video statistics, fetching up to MAX_IDS_PER_REQUEST videos per call
+        video_data_by_id = {}
+        for start in range(0, len(video_ids), self.MAX_IDS_PER_REQUEST):
             video_request = self.youtube.videos().list(
                 part='statistics,snippet',
-                id=video_id
+                id=','.join(video_ids[start:start + self.MAX_IDS_PER_REQUEST])
             )
             video_response = video_request.execute()
-            
-            if video_response['items']:
-                video_data = video_response['items'][0]
+            video_data_by_id.update((video_data['id'], video_data) for video_data in video_response['items'])
+
+        # Keep the search order, which is by view count
+        videos = []
+        for video_id in video_ids:
+            video_data = video_data_by_id.get(video_id)
+            if video_data:
                 videos.append({
                     'id': video_id,
                     'title': video_data['snippet']['title'],
@@ -86,8 +155,7 @@ class YoutubeCrawler:
     def get_transcript(self, video_id: str) -> List[Dict]:
         """Get transcript for a specific video."""
         try:
-            transcript = YouTubeTranscriptApi.get_transcript(video_id)
-            return transcript
+            return self.transcript_api.fetch(video_id).to_raw_data()
         except TranscriptsDisabled:
             print(f"Transcripts are disabled for video {video_id}")
             return []
@@ -97,13 +165,9 @@ class YoutubeCrawler:
     
     def sanitize_filename(self, filename: str) -> str:
         """Convert a string to a valid filename by removing or replacing invalid characters."""
-        # Remove invalid characters and replace spaces with underscores
-        filename = re.sub(r'[<>:"/\\|?*]', '', filename)
-        filename = filename.replace(' ', '_')
-        # Ensure the filename is not too long (max 255 characters including extension)
-        if len(filename) > 250:  # Leave room for extension
-            filename = filename[:250]
-        return filename
+        # Remove invalid characters and replace spaces with underscores in one pass,
+        # keeping the filename short enough for an extension (max 255 characters)
+        return filename.translate(self.FILENAME_TRANSLATION)[:250]
 
     def get_channel_name(self, channel_url: str) -> str:
         """Extract channel name from URL."""
@@ -111,6 +175,51 @@ class YoutubeCrawler:
             return channel_url.split('@')[-1]
         return 'unknown_channel'
 
+    def print_video(self, video: Dict):
+        """Print a video's title, view count and source."""
+        print(f"\nVideo: {video['title']}")
+        print(f"Views: {video['views']}")
+        print(f"Source: {video['source']}")
+
+    def save_transcript(self, video: Dict, transcript: List[Dict], channel_dir: Path):
+        """Save a video's transcript to the channel directory, named after the video title."""
+        if not transcript:
+            print(f"No transcript available for video: {video['title']}")
+            return
+
+        # Create filename from video title
+        safe_title = self.sanitize_filename(video['title'])
+        output_file = channel_dir / f"{safe_title}.json"
+        
+        output_file.write_bytes(orjson.dumps({
+            'video_info': video,
+            'transcript': transcript
+        }, option=orjson.OPT_INDENT_2))
+        print(f"Transcript saved to {output_file}")
+
+    def download_transcripts(self, videos: List[Dict], channel_dir: Path):
+        """Download and save the transcripts of several videos concurrently.
+
+        Args:
+            videos (List[Dict]): Videos from get_top_videos
+            channel_dir (Path): Directory the transcripts are saved to
+        """
+        with ThreadPoolExecutor(max_workers=self.TRANSCRIPT_WORKERS) as executor:
+            futures = {}
+            for video in videos:
+                self.print_video(video)
+                # Rate limit the requests so the download does not overload the transcript service
+                time.sleep(self.REQUEST_INTERVAL_SECONDS)
+                futures[executor.submit(self.get_transcript, video['id'])] = video
+
+            for future in as_completed(futures):
+                video = futures[future]
+                # Report failures per video, so one failure does not discard the other transcripts
+                try:
+                    self.save_transcript(video, future.result(), channel_dir)
+                except Exception as e:
+                    print(f"Error saving transcript for video {video['title']}: {str(e)}")
+
     def process_channel(self, channel_url: str, interactive: bool = True):
         """Process a YouTube channel's top videos.
         
@@ -127,31 +236,16 @@ class YoutubeCrawler:
             channel_dir = self.base_dir / channel_name
             channel_dir.mkdir(parents=True, exist_ok=True)
             
+            if not interactive:
+                self.download_transcripts(videos, channel_dir)
+                return
+
             for video in videos:
-                print(f"\nVideo: {video['title']}")
-                print(f"Views: {video['views']}")
-                print(f"Source: {video['source']}")
-                
-                should_process = True
-                if interactive:
-                    process = input("Process this video? (y/n): ").lower().strip()
-                    should_process = process == 'y'
+                self.print_video(video)
                 
-                if should_process:
-                    transcript = self.get_transcript(video['id'])
-                    if transcript:
-                        # Create filename from video title
-                        safe_title = self.sanitize_filename(video['title'])
-                        output_file = channel_dir / f"{safe_title}.json"
-                        
-                        with open(output_file, 'w', encoding='utf-8') as f:
-                            json.dump({
-                                'video_info': video,
-                                'transcript': transcript
-                            }, f, indent=2, ensure_ascii=False)
-                        print(f"Transcript saved to {output_file}")
-                    else:
-                        print("No transcript available for this video")
+                process = input("Process this video? (y/n): ").lower().strip()
+                if process == 'y':
+                    self.save_transcript(video, self.get_transcript(video['id']), channel_dir)
                 
         except Exception as e:
             print(f"Error processing channel: {str(e)}")
@@ -7,21 +7,28 @@ The app provides three main functionalities:
 3. Answer coffee-related questions using AI
 """
 
+from typing import Callable
 import streamlit as st
 from guaxinim.core.coffee_data import CoffeePreparationData
 from guaxinim.core.bot_manager import get_bot
+from guaxinim.core.guaxinim_bot import GuaxinimBot
 from guaxinim.core.cache import clear_cache
 from guaxinim.ui.similarity_search_page import search_coffee_documents
 
 # Define brewing methods globally
-BREWING_METHODS = [
-    "V60",
-    "French Press",
-    "Aeropress",
-    "Chemex",
-    "Moka Pot",
-    "Espresso",
-]
+BREWING_METHODS = list(GuaxinimBot.SUPPORTED_METHODS)
+
+# Fixed widget options, built once at import instead of on every rerun
+COFFEE_ISSUES = ("Too acidic", "Too bitter", "Seems under-extracted", "Other")
+GRINDER_GRANULARITIES = ("", "Fine", "Medium-Fine", "Medium", "Medium-Coarse", "Coarse")
+RAG_RETURN_TYPES = ("chunks", "whole file")
+SIMILARITY_FIELDS = ("chunks", "summary")
+SUGGESTED_QUESTIONS = (
+    "What is coffee bloom?",
+    "How does grind size affect coffee extraction?",
+    "What's the difference between Arabica and Robusta?",
+    "How should I store coffee beans?",
+)
 
 
 def display_sources(sources, title: str = "Sources"):
@@ -40,6 +47,24 @@ def display_sources(sources, title: str = "Sources"):
                 st.markdown(f"  *{', '.join(source['tags'])}*")
 
 
+def stream_writer(placeholder) -> Callable[[str], None]:
+    """
+    Create a callback that renders streamed answer text into a placeholder as it arrives.
+
+    Args:
+        placeholder: Streamlit placeholder created with st.empty()
+
+    Returns:
+        Callable[[str], None]: Callback to pass to GuaxinimBot.streaming()
+    """
+    parts = []
+
+    def write(text: str):
+        parts.append(text)
+        placeholder.markdown("".join(parts))
+    return write
+
+
 def get_coffee_preparation_data(show_all_fields: bool = True) -> CoffeePreparationData:
     """
     Collects coffee preparation parameters from the user interface.
@@ -54,7 +79,7 @@ def get_coffee_preparation_data(show_all_fields: bool = True) -> CoffeePreparati
 
     issue = st.selectbox(
         "Issue encountered (required):",
-        ["Too acidic", "Too bitter", "Seems under-extracted", "Other"],
+        COFFEE_ISSUES,
     )
 
     brewing_method = st.selectbox(
@@ -107,7 +132,7 @@ def get_coffee_preparation_data(show_all_fields: bool = True) -> CoffeePreparati
 
         grinder_granularity = st.selectbox(
             "Grinder granularity:",
-            ["", "Fine", "Medium-Fine", "Medium", "Medium-Coarse", "Coarse"],
+            GRINDER_GRANULARITIES,
         )
         grinder_granularity = grinder_granularity if grinder_granularity else None
 
@@ -184,7 +209,11 @@ def learn_coffee_making():
             max_files = st.session_state.get('max_whole_files')
             similarity_field = st.session_state.get('similarity_field', 'chunks')
             bot = get_bot(max_whole_files=max_files, similarity_field=similarity_field)
-            st.session_state.guide_response = bot.get_coffee_guide(method, rag_return_type=rag_return)
+            placeholder = st.empty()
+            with bot.streaming(stream_writer(placeholder)):
+                st.session_state.guide_response = bot.get_coffee_guide(method, rag_return_type=rag_return)
+            # The finished guide is rendered below with its sources
+            placeholder.empty()
     
     # Display results if we have them
     if st.session_state.guide_response:
@@ -213,8 +242,10 @@ def improve_coffee():
             max_files = st.session_state.get('max_whole_files')
             similarity_field = st.session_state.get('similarity_field', 'chunks')
             bot = get_bot(max_whole_files=max_files, similarity_field=similarity_field)
-            response = bot.improve_coffee(coffee_data, rag_return_type=rag_return)
-            st.markdown(response.answer)
+            placeholder = st.empty()
+            with bot.streaming(stream_writer(placeholder)):
+                response = bot.improve_coffee(coffee_data, rag_return_type=rag_return)
+            placeholder.markdown(response.answer)
             
             display_sources(response.sources)
 
@@ -229,20 +260,12 @@ def learn_about_coffee():
     st.header("Learn About Coffee")
     st.write("Choose a question or ask your own!")
 
-    # Define suggested questions
-    questions = [
-        "What is coffee bloom?",
-        "How does grind size affect coffee extraction?",
-        "What's the difference between Arabica and Robusta?",
-        "How should I store coffee beans?",
-    ]
-
     # Create columns for better button layout
     cols = st.columns(2)
     
     # Create buttons for suggested questions
     selected_question = None
-    for i, question in enumerate(questions):
+    for i, question in enumerate(SUGGESTED_QUESTIONS):
         col_idx = i % 2
         if cols[col_idx].button(question):
             selected_question = question
@@ -268,9 +291,11 @@ def learn_about_coffee():
             max_files = st.session_state.get('max_whole_files')
             similarity_field = st.session_state.get('similarity_field', 'chunks')
             bot = get_bot(max_whole_files=max_files, similarity_field=similarity_field)
-            response = bot.ask_guaxinim(selected_question, rag_return_type=rag_return)
             st.write("### Answer")
-            st.write(response.answer)
+            placeholder = st.empty()
+            with bot.streaming(stream_writer(placeholder)):
+                response = bot.ask_guaxinim(selected_question, rag_return_type=rag_return)
+            placeholder.markdown(response.answer)
             
             # Display sources if available
             display_sources(response.sources, "Sources Used")
@@ -291,7 +316,7 @@ def initialize_settings():
         st.subheader("Search Settings")
         rag_return = st.selectbox(
             "RAG return",
-            options=["chunks", "whole file"],
+            options=RAG_RETURN_TYPES,
             help="Choose how to return context from the knowledge base"
         )
         # Store the setting in session state so it's accessible across the app
@@ -315,7 +340,7 @@ def initialize_settings():
         # Add similarity field selection
         similarity_field = st.selectbox(
             "Similarity Field",
-            options=["chunks", "summary"],
+            options=SIMILARITY_FIELDS,
             help="Choose which field to use for similarity search"
         )
         if 'similarity_field' not in st.session_state or st.session_state.similarity_field != similarity_field:
@@ -4,12 +4,22 @@ This page allows users to search through coffee-related documents using semantic
 """
 
 import streamlit as st
-from src.pdf_processor.similarity_search import DocumentSearcher
-from guaxinim.core.bot_manager import get_bot
+from src.pdf_processor.similarity_search import DocumentSearcher, get_shared_searcher
+from guaxinim.core.bot_manager import get_encoder
 
 @st.cache_resource
-def get_document_searcher():
-    return DocumentSearcher()
+def get_document_searcher() -> DocumentSearcher:
+    """Get the searcher shared with the bot, so the encoder and indexes are loaded once."""
+    return get_shared_searcher(get_encoder())
+
+@st.cache_data(ttl=3600)
+def get_tag_options(_searcher: DocumentSearcher):
+    """Tags by frequency, with their display labels and document counts, computed once instead of on every rerun."""
+    tags_with_freq = _searcher.get_tags_with_frequency()
+    tag_options = [tag for tag, _ in tags_with_freq]
+    tag_display = {tag: f"{tag.replace('_', ' ').title()} ({count} documents)"
+                   for tag, count in tags_with_freq}
+    return tag_options, tag_display, dict(tags_with_freq)
 
 def display_chunk_results(results):
     """Display chunk search results in a nice format."""
@@ -85,13 +95,8 @@ def search_coffee_documents():
 
     with tag_search_tab:
         # Tag search interface
-        tags_with_freq = searcher.get_tags_with_frequency()
-        if tags_with_freq:
-            # Format options to show tag and count
-            tag_options = [tag for tag, _ in tags_with_freq]
-            tag_display = {tag: f"{tag.replace('_', ' ').title()} ({count} documents)" 
-                          for tag, count in tags_with_freq}
-            
+        tag_options, tag_display, count_by_tag = get_tag_options(searcher)
+        if tag_options:
             selected_tag = st.selectbox(
                 "Select a topic to explore:",
                 options=tag_options,
@@ -99,7 +104,7 @@ def search_coffee_documents():
             )
 
             if selected_tag:
-                count = dict(tags_with_freq)[selected_tag]
+                count = count_by_tag[selected_tag]
                 st.subheader(f"Documents about {selected_tag.replace('_', ' ').title()} ({count} documents)")
                 tag_results = searcher.search_by_tag(selected_tag, limit=10)
                 display_tag_results(tag_results)
@@ -0,0 +1,79 @@
+"""
+Exact nearest-neighbour search used when FAISS is not installed.
+The distance kernel is compiled with Numba when it is available.
+"""
+
+from typing import Tuple
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional; fall back to a numpy matrix-vector product
+    njit = None
+
+
+def _squared_l2_distances_numpy(embeddings: np.ndarray, norms: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Squared L2 distance from the query to every row, using precomputed row norms."""
+    return norms - 2.0 * (embeddings @ query) + np.dot(query, query)
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True, fastmath=True)
+    def _squared_l2_distances(embeddings, norms, query):  # pragma: no cover - requires numba
+        query_norm = np.dot(query, query)
+        distances = np.empty(embeddings.shape[0], dtype=np.float32)
+        for i in prange(embeddings.shape[0]):
+            dot = 0.0
+            for j in range(embeddings.shape[1]):
+                dot += embeddings[i, j] * query[j]
+            distances[i] = norms[i] - 2.0 * dot + query_norm
+        return distances
+else:
+    _squared_l2_distances = _squared_l2_distances_numpy
+
+
+class ExactIndex:
+    """
+    A brute-force index exposing the subset of the FAISS index API used by DocumentSearcher.
+
+    Distances are squared L2, like faiss.IndexFlatL2 and faiss.IndexHNSWFlat.
+    """
+
+    def __init__(self, dimension: int):
+        """Initialize an empty index for vectors of the given dimension."""
+        self.d = dimension
+        self.embeddings = np.empty((0, dimension), dtype=np.float32)
+        self.norms = np.empty(0, dtype=np.float32)
+
+    @property
+    def ntotal(self) -> int:
+        """Number of indexed vectors."""
+        return self.embeddings.shape[0]
+
+    def add(self, embeddings: np.ndarray) -> None:
+        """Add a (n, d) matrix of vectors to the index."""
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.embeddings = np.ascontiguousarray(np.vstack([self.embeddings, embeddings]))
+        self.norms = np.einsum('ij,ij->i', self.embeddings, self.embeddings)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the k nearest vectors for each query row.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (n, k) distances and indices, padded with -1
+                when the index holds fewer than k vectors
+        """
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        indices = np.full((len(queries), k), -1, dtype=np.int64)
+        found = min(k, self.ntotal)
+        if found == 0:
+            return distances, indices
+
+        for row, query in enumerate(queries):
+            scores = _squared_l2_distances(self.embeddings, self.norms, query)
+            nearest = np.argpartition(scores, found - 1)[:found]
+            nearest = nearest[np.argsort(scores[nearest])]
+            distances[row, :found] = scores[nearest]
+            indices[row, :found] = nearest
+        return distances, indices
@@ -3,18 +3,14 @@ import sys
 import json
 import argparse
 import numpy as np
-import PyPDF2
+import pymupdf
 from typing import Dict, List, Union
 from sentence_transformers import SentenceTransformer
 
 def extract_pdf_content(pdf_path: str) -> str:
     """Extract text content from a PDF file."""
-    with open(pdf_path, 'rb') as file:
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ''
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-    return text
+    with pymupdf.open(pdf_path) as document:
+        return ''.join(page.get_text() for page in document)
 
 def split_into_chunks(text: str, chunk_size: int = 1000) -> List[str]:
     """Split text into chunks of approximately equal size."""
@@ -85,20 +81,15 @@ def process_pdf_folder(folder_path: str, create_embeddings_flag: bool = False, m
             # Get title (first line)
             title = lines[0].strip() if lines else "Untitled"
             
-            # Find source and its line index
-            source = ""
-            source_line_index = -1
-            for i, line in enumerate(lines):
-                if "--source--" in line:
-                    source = line.replace("--source--", "").strip()
-                    source_line_index = i
-                    break
-            
-            # Remove title and source line from content before creating chunks
+            # Find the source line, dropping it and the title from the content in one pass
+            source = None
             filtered_lines = []
-            for i, line in enumerate(lines):
-                if i != 0 and i != source_line_index:  # Skip title (index 0) and source line
+            for line in lines[1:]:
+                if source is None and "--source--" in line:
+                    source = line.replace("--source--", "").strip()
+                else:
                     filtered_lines.append(line)
+            source = source or ""
             
             # Create chunks from filtered content
             filtered_content = '\n'.join(filtered_lines)
@@ -1,25 +1,64 @@
+import hashlib
 import json
+import logging
+import mmap
+import os
+import threading
+from functools import cached_property
 import numpy as np
-import faiss
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from sentence_transformers import SentenceTransformer
 from guaxinim.core.logger import logger
+from guaxinim.core.query_encoder import BatchingQueryEncoder
+from src.pdf_processor.exact_search import ExactIndex
+
+try:
+    import faiss
+except ImportError:  # FAISS is optional; fall back to exact search
+    faiss = None
+
+# Opt-in read-ahead of memory-mapped embeddings; it can regress workloads already in memory
+PREFETCH_ENABLED = os.getenv('GUAXINIM_PREFETCH') == '1'
+
+def _prefetch(embeddings: np.memmap) -> None:
+    """Ask the kernel to start reading a memory-mapped array's pages ahead of use."""
+    mapping = getattr(embeddings, '_mmap', None)
+    if mapping is None or not hasattr(mmap, 'MADV_WILLNEED'):
+        return
+    try:
+        mapping.madvise(mmap.MADV_WILLNEED)
+    except (OSError, ValueError) as e:
+        logger.debug("Could not prefetch embeddings: %s", e)
+
+def _has_embedding(embedding) -> bool:
+    """Check that an embedding (list or numpy array) is present and non-empty."""
+    return embedding is not None and len(embedding) > 0
 
 class DocumentSearcher:
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    # HNSW graph parameters: neighbors per node, build-time and query-time beam widths
+    # Vectors are stored as 8-bit scalar-quantized codes, a quarter of the float32 size
+    HNSW_NEIGHBORS = 32
+    HNSW_EF_CONSTRUCTION = 200
+    HNSW_EF_SEARCH = 64
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', model: SentenceTransformer = None):
         """Initialize the document searcher to load documents from the data/processed/documents directory.
         
         Args:
             model_name (str): Name of the sentence-transformer model to use for new queries
+            model (SentenceTransformer, optional): Already loaded model to use instead of loading model_name
         """
         self.documents_dir = 'data/processed/documents'
-        self.model = SentenceTransformer(model_name)
+        self.index_dir = 'data/processed/indexes'
+        self.model = model or SentenceTransformer(model_name)
+        self.query_encoder = BatchingQueryEncoder(self.model)
         self.documents = self._load_documents()
         
         if not self.documents:
             raise ValueError(f'No documents found in {self.documents_dir}')
             
         # Initialize FAISS indexes for different types of embeddings
+        self.fingerprint = self._documents_fingerprint()
         self.embedding_dim = len(self.documents[0]['title_embedding'])  # All embeddings should have same dimension
         self.chunk_index = self._create_chunk_index()
         self.title_index = self._create_title_index()
@@ -33,7 +72,6 @@ class DocumentSearcher:
     def _load_documents(self) -> List[Dict]:
         """Load all JSON documents from the data/processed/documents directory."""
         documents = []
-        import os
         if not os.path.exists(self.documents_dir):
             return documents
             
@@ -43,60 +81,129 @@ class DocumentSearcher:
                 with open(file_path, 'r', encoding='utf-8') as f:
                     try:
                         doc = json.load(f)
-                        documents.extend(doc if isinstance(doc, list) else [doc])
                     except json.JSONDecodeError:
                         print(f'Error loading {filename}: Invalid JSON format')
                         continue
+                if isinstance(doc, list):
+                    documents.extend(doc)
+                else:
+                    documents.append(self._attach_embeddings(doc, file_path))
         return documents
+
+    def _attach_embeddings(self, doc: Dict, file_path: str) -> Dict:
+        """Attach embeddings stored in the document's .npy sidecar, if present.
+
+        The sidecar holds one row per text: title, summary, then each chunk.
+        """
+        sidecar_path = os.path.splitext(file_path)[0] + '.npy'
+        if 'title_embedding' in doc or not os.path.exists(sidecar_path):
+            return doc
+        # Memory-map so pages are only read when the indexes are built
+        embeddings = np.load(sidecar_path, mmap_mode='r')
+        if PREFETCH_ENABLED:
+            _prefetch(embeddings)
+        doc['title_embedding'] = embeddings[0]
+        doc['summary_embedding'] = embeddings[1]
+        doc['chunk_embeddings'] = embeddings[2:]
+        return doc
     
-    def _create_chunk_index(self) -> faiss.IndexFlatL2:
+    def _documents_fingerprint(self) -> str:
+        """Fingerprint the documents directory so persisted indexes are rebuilt when it changes."""
+        digest = hashlib.blake2b(digest_size=8)
+        if os.path.exists(self.documents_dir):
+            for filename in sorted(os.listdir(self.documents_dir)):
+                stat = os.stat(os.path.join(self.documents_dir, filename))
+                digest.update(f"{filename}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _read_index(index_path: str) -> "faiss.Index":
+        """Read a persisted index memory-mapped, so processes serving the same files share its pages.
+
+        Falls back to a regular read for FAISS builds or index types that cannot be mapped.
+        """
+        try:
+            return faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except (AttributeError, RuntimeError) as e:
+            logger.debug("Memory-mapped read of %s failed, reading it into memory: %s", index_path, e)
+            return faiss.read_index(index_path)
+
+    def _build_index(self, name: str, embeddings: List) -> "faiss.IndexHNSWSQ":
+        """Build a scalar-quantized HNSW index over the embeddings, reusing a persisted copy when available.
+
+        Args:
+            name (str): Index name used for the persisted file ('chunk', 'title' or 'summary')
+            embeddings (List): Embeddings to index, in mapping order
+
+        Returns:
+            faiss.IndexHNSWSQ: Index searched with (squared) L2 distance, or an
+                ExactIndex when FAISS is not installed
+        """
+        if faiss is None:
+            index = ExactIndex(self.embedding_dim)
+            if embeddings:
+                index.add(np.array(embeddings, dtype=np.float32))
+            return index
+
+        index_path = os.path.join(self.index_dir, f'{name}-sq8-{self.fingerprint}.faiss')
+        if os.path.exists(index_path):
+            index = self._read_index(index_path)
+            index.hnsw.efSearch = self.HNSW_EF_SEARCH
+            return index
+
+        index = faiss.IndexHNSWSQ(self.embedding_dim, faiss.ScalarQuantizer.QT_8bit, self.HNSW_NEIGHBORS)
+        index.hnsw.efConstruction = self.HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = self.HNSW_EF_SEARCH
+        if embeddings:
+            vectors = np.array(embeddings, dtype=np.float32)
+            # Learn the per-dimension value ranges used for quantization
+            index.train(vectors)
+            index.add(vectors)
+
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            # Drop indexes persisted for an older version of the documents
+            for filename in os.listdir(self.index_dir):
+                if filename.startswith(f'{name}-') and filename.endswith('.faiss'):
+                    os.remove(os.path.join(self.index_dir, filename))
+            faiss.write_index(index, index_path)
+        except OSError as e:
+            logger.warning(f"Could not persist {name} index: {e}")
+        return index
+
+    def _create_chunk_index(self) -> "faiss.IndexHNSWSQ":
         """Create FAISS index for chunks."""
-        index = faiss.IndexFlatL2(self.embedding_dim)
-        
         # Collect all chunk embeddings
         embeddings = []
         for doc in self.documents:
-            if doc.get('chunk_embeddings'):
+            if _has_embedding(doc.get('chunk_embeddings')):
                 embeddings.extend(doc['chunk_embeddings'])
-        
-        if embeddings:
-            index.add(np.array(embeddings, dtype=np.float32))
-        return index
+        return self._build_index('chunk', embeddings)
     
-    def _create_title_index(self) -> faiss.IndexFlatL2:
+    def _create_title_index(self) -> "faiss.IndexHNSWSQ":
         """Create FAISS index for titles."""
-        index = faiss.IndexFlatL2(self.embedding_dim)
-        
         # Collect all title embeddings
         embeddings = []
         for doc in self.documents:
-            if doc.get('title_embedding'):
+            if _has_embedding(doc.get('title_embedding')):
                 embeddings.append(doc['title_embedding'])
+        return self._build_index('title', embeddings)
         
-        if embeddings:
-            index.add(np.array(embeddings, dtype=np.float32))
-        return index
-        
-    def _create_summary_index(self) -> faiss.IndexFlatL2:
+    def _create_summary_index(self) -> "faiss.IndexHNSWSQ":
         """Create FAISS index for summaries."""
-        index = faiss.IndexFlatL2(self.embedding_dim)
-        
         # Collect all summary embeddings
         embeddings = []
         for doc in self.documents:
-            if doc.get('summary_embedding'):
+            if _has_embedding(doc.get('summary_embedding')):
                 embeddings.append(doc['summary_embedding'])
-        
-        if embeddings:
-            index.add(np.array(embeddings, dtype=np.float32))
-        return index
+        return self._build_index('summary', embeddings)
     
     def _create_chunk_mapping(self) -> List[Tuple[int, int, str]]:
         """Create mapping of chunk index to document and chunk index."""
         mapping = []
         global_idx = 0
         for doc_idx, doc in enumerate(self.documents):
-            if doc.get('chunk_embeddings'):
+            if _has_embedding(doc.get('chunk_embeddings')):
                 for chunk_idx in range(len(doc['chunk_embeddings'])):
                     mapping.append((doc_idx, chunk_idx, doc['chunks'][chunk_idx]))
                     global_idx += 1
@@ -106,7 +213,7 @@ class DocumentSearcher:
         """Create mapping of title index to document index."""
         mapping = []
         for doc_idx, doc in enumerate(self.documents):
-            if doc.get('title_embedding'):
+            if _has_embedding(doc.get('title_embedding')):
                 mapping.append((doc_idx, doc['title']))
         return mapping
                 
@@ -114,66 +221,99 @@ class DocumentSearcher:
         """Create mapping of summary index to document index."""
         mapping = []
         for doc_idx, doc in enumerate(self.documents):
-            if doc.get('summary_embedding'):
+            if _has_embedding(doc.get('summary_embedding')):
                 mapping.append((doc_idx, doc['summary']))
         return mapping
     
-    def search_similar_chunks(self, query: str, k: int = 5) -> List[Dict]:
+    def encode_query(self, query: str) -> np.ndarray:
+        """Embed a query as a float32 row vector ready for FAISS search.
+
+        Queries arriving concurrently are encoded together in one batch.
+        """
+        return self.query_encoder.encode(query)
+
+    def _search_index(self, search_type: str, query_embedding: np.ndarray, k: int,
+                      min_score: Optional[float] = None) -> List[Dict]:
+        """Search one FAISS index with an already computed query embedding."""
+        index = {
+            'chunk': self.chunk_index,
+            'title': self.title_index,
+            'summary': self.summary_index
+        }[search_type]
+        distances, indices = index.search(query_embedding, k)
+        return self._collect_search_results(distances[0], indices[0], search_type=search_type, min_score=min_score)
+
+    def search(self, query: str, k_by_type: Dict[str, int], min_score: Optional[float] = None) -> Dict[str, List[Dict]]:
+        """Search several indexes for a query, embedding it only once.
+
+        Args:
+            query (str): The search query
+            k_by_type (Dict[str, int]): Number of results to return per search type
+                                        ('chunk', 'title' or 'summary')
+            min_score (float, optional): Only return results with a higher similarity score
+
+        Returns:
+            Dict[str, List[Dict]]: Search results keyed by search type
+        """
+        query_embedding = self.encode_query(query)
+        return {
+            search_type: self._search_index(search_type, query_embedding, k, min_score)
+            for search_type, k in k_by_type.items()
+        }
+
+    def search_similar_chunks(self, query: str, k: int = 5, min_score: Optional[float] = None) -> List[Dict]:
         """Search for chunks similar to the query.
         
         Args:
             query (str): The search query
             k (int): Number of similar chunks to return
+            min_score (float, optional): Only return chunks with a higher similarity score
             
         Returns:
             List[Dict]: List of dictionaries containing similar chunks and their metadata
         """
-        # Create query embedding
-        query_embedding = self.model.encode([query])[0]
-        query_embedding = np.array([query_embedding], dtype=np.float32)
-        
-        # Search in FAISS index
-        distances, indices = self.chunk_index.search(query_embedding, k)
-        
-        return self._collect_search_results(distances[0], indices[0], search_type='chunk')
+        return self._search_index('chunk', self.encode_query(query), k, min_score)
     
-    def search_similar_titles(self, query: str, k: int = 5) -> List[Dict]:
+    def search_similar_titles(self, query: str, k: int = 5, min_score: Optional[float] = None) -> List[Dict]:
         """Search for documents with titles similar to the query.
         
         Args:
             query (str): The search query
             k (int): Number of similar titles to return
+            min_score (float, optional): Only return titles with a higher similarity score
             
         Returns:
             List[Dict]: List of dictionaries containing similar documents and their metadata
         """
-        # Create query embedding
-        query_embedding = self.model.encode([query])[0]
-        query_embedding = np.array([query_embedding], dtype=np.float32)
-        
-        # Search in FAISS index
-        distances, indices = self.title_index.search(query_embedding, k)
+        return self._search_index('title', self.encode_query(query), k, min_score)
         
-        return self._collect_search_results(distances[0], indices[0], search_type='title')
-        
-    def search_similar_summaries(self, query: str, k: int = 5) -> List[Dict]:
+    def search_similar_summaries(self, query: str, k: int = 5, min_score: Optional[float] = None) -> List[Dict]:
         """Search for documents with summaries similar to the query.
         
         Args:
             query (str): The search query
             k (int): Number of similar summaries to return
+            min_score (float, optional): Only return summaries with a higher similarity score
             
         Returns:
             List[Dict]: List of dictionaries containing similar documents and their metadata
         """
-        # Create query embedding
-        query_embedding = self.model.encode([query])[0]
-        query_embedding = np.array([query_embedding], dtype=np.float32)
-        
-        # Search in FAISS index
-        distances, indices = self.summary_index.search(query_embedding, k)
-        
-        return self._collect_search_results(distances[0], indices[0], search_type='summary')
+        return self._search_index('summary', self.encode_query(query), k, min_score)
+
+    @cached_property
+    def clean_sources(self) -> List[str]:
+        """Cleaned source URL of each document, in document order, built once on first use."""
+        return [self._clean_url(doc['source']) for doc in self.documents]
+
+    @cached_property
+    def docs_by_tag(self) -> Dict[str, List[int]]:
+        """Indices of the documents carrying each tag, built once on first use."""
+        index: Dict[str, List[int]] = {}
+        for doc_idx, doc in enumerate(self.documents):
+            # A tag listed twice on one document still counts once
+            for tag in dict.fromkeys(doc.get('tags') or ()):
+                index.setdefault(tag, []).append(doc_idx)
+        return index
 
     def get_tags_with_frequency(self) -> List[Tuple[str, int]]:
         """Get all unique tags from the document collection with their frequencies.
@@ -182,11 +322,7 @@ class DocumentSearcher:
             List[Tuple[str, int]]: List of tuples containing (tag, frequency) pairs,
                                    sorted by frequency in descending order
         """
-        tag_counts = {}
-        for doc in self.documents:
-            if doc.get('tags'):
-                for tag in doc['tags']:
-                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
+        tag_counts = {tag: len(doc_indices) for tag, doc_indices in self.docs_by_tag.items()}
         
         # Sort by frequency (descending) and then by tag name (ascending)
         sorted_tags = sorted(tag_counts.items(), key=lambda x: (-x[1], x[0]))
@@ -222,66 +358,101 @@ class DocumentSearcher:
             List[Dict]: List of documents with the specified tag
         """
         results = []
-        for doc in self.documents:
-            if doc.get('tags') and tag in doc['tags']:
-                results.append({
-                    'title': doc['title'],
-                    'source': self._clean_url(doc['source']),
-                    'summary': doc.get('summary', ''),
-                    'tags': doc['tags']
-                })
-        return results[:limit]
+        for doc_idx in self.docs_by_tag.get(tag, [])[:limit]:
+            doc = self.documents[doc_idx]
+            results.append({
+                'title': doc['title'],
+                'source': self.clean_sources[doc_idx],
+                'summary': doc.get('summary', ''),
+                'tags': doc['tags']
+            })
+        return results
 
-    def _collect_search_results(self, distances: np.ndarray, indices: np.ndarray, search_type: str = 'chunk') -> List[Dict]:
+    def _collect_search_results(self, distances: np.ndarray, indices: np.ndarray, search_type: str = 'chunk',
+                                min_score: Optional[float] = None) -> List[Dict]:
         """Collect search results from FAISS search output.
         
         Args:
             distances (np.ndarray): Array of distances from FAISS search
             indices (np.ndarray): Array of indices from FAISS search
             search_type (str): Type of search being performed ('chunk', 'title', or 'summary')
+            min_score (float, optional): Skip results whose similarity score is not above this
             
         Returns:
             List[Dict]: List of dictionaries containing search results and metadata
         """
         results = []
         for dist, idx in zip(distances, indices):
-            if idx != -1:  # Valid index
-                if search_type == 'chunk':
-                    doc_idx, chunk_idx, chunk_text = self.chunk_mapping[idx]
-                    doc = self.documents[doc_idx]
-                    result = {
-                        'title': doc['title'],
-                        'source': self._clean_url(doc['source']),
-                        'chunk_text': chunk_text,
-                        'full_text': doc.get('full_text', ''),  # Include full text in results
-                        'tags': doc.get('tags', []),
-                        'similarity_score': 1 - dist/2
-                    }
-                elif search_type == 'title':
-                    doc_idx, title = self.title_mapping[idx]
-                    doc = self.documents[doc_idx]
-                    result = {
-                        'title': title,
-                        'source': self._clean_url(doc['source']),
-                        'full_text': doc.get('full_text', ''),  # Include full text in results
-                        'tags': doc.get('tags', []),
-                        'similarity_score': 1 - dist/2
-                    }
-                elif search_type == 'summary':                    
-                    doc_idx, summary = self.summary_mapping[idx]
-                    doc = self.documents[doc_idx]
-                    result = {
-                        'title': doc['title'],
-                        'source': self._clean_url(doc['source']),
-                        'summary': summary,
-                        'full_text': doc.get('full_text', ''),  # Include full text in results
-                        'tags': doc.get('tags', []),
-                        'similarity_score': 1 - dist/2
-                    }
-                    logger.info("Summary return with title: {} and distance: {}".format(doc['title'], 1 - dist/2))
-                results.append(result)
+            if idx == -1:  # Invalid index
+                continue
+            # Plain Python scores, so NumPy scalars do not leak into the results
+            score = float(1 - dist / 2)
+            if min_score is not None and score <= min_score:
+                continue
+            if search_type == 'chunk':
+                doc_idx, chunk_idx, chunk_text = self.chunk_mapping[idx]
+                doc = self.documents[doc_idx]
+                result = {
+                    'title': doc['title'],
+                    'source': self.clean_sources[doc_idx],
+                    'chunk_text': chunk_text,
+                    'full_text': doc.get('full_text', ''),  # Include full text in results
+                    'tags': doc.get('tags', []),
+                    'similarity_score': score
+                }
+            elif search_type == 'title':
+                doc_idx, title = self.title_mapping[idx]
+                doc = self.documents[doc_idx]
+                result = {
+                    'title': title,
+                    'source': self.clean_sources[doc_idx],
+                    'full_text': doc.get('full_text', ''),  # Include full text in results
+                    'tags': doc.get('tags', []),
+                    'similarity_score': score
+                }
+            elif search_type == 'summary':                    
+                doc_idx, summary = self.summary_mapping[idx]
+                doc = self.documents[doc_idx]
+                result = {
+                    'title': doc['title'],
+                    'source': self.clean_sources[doc_idx],
+                    'summary': summary,
+                    'full_text': doc.get('full_text', ''),  # Include full text in results
+                    'tags': doc.get('tags', []),
+                    'similarity_score': score
+                }
+            results.append(result)
+
+        if search_type == 'summary' and logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Summary results (title, similarity): %s",
+                [(result['title'], round(float(result['similarity_score']), 3)) for result in results]
+            )
         return results
 
+_shared_searchers: Dict[int, Tuple[SentenceTransformer, "DocumentSearcher"]] = {}
+_shared_searchers_lock = threading.Lock()
+
+def get_shared_searcher(model: SentenceTransformer = None) -> DocumentSearcher:
+    """Get the process-wide DocumentSearcher for a model, creating it on first use.
+
+    Searchers are shared per model instance, so bots rebuilt with the same encoder
+    reuse the loaded documents and indexes instead of building them again.
+
+    Args:
+        model (SentenceTransformer, optional): Already loaded model; the default model is loaded if not given
+
+    Raises:
+        ValueError: If no documents are found
+    """
+    with _shared_searchers_lock:
+        entry = _shared_searchers.get(id(model))
+        if entry is None:
+            # Keep a reference to the model so its id cannot be reused by another object
+            entry = (model, DocumentSearcher(model=model))
+            _shared_searchers[id(model)] = entry
+        return entry[1]
+
 def main():
     # Example usage
     searcher = DocumentSearcher()
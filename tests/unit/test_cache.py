@@ -0,0 +1,190 @@
+"""
+Unit tests for the persistent cache
+"""
+
+import threading
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List
+from unittest.mock import patch, MagicMock
+
+from guaxinim.core.cache import LRUCache, fast_asdict, persistent_cache
+from guaxinim.core.coffee_data import CoffeePreparationData
+
+
+@dataclass
+class Response:
+    """Stand-in for a cached bot response"""
+    answer: str
+    sources: List[Dict[str, str]]
+
+
+class TestLRUCache(unittest.TestCase):
+    """Test cases for the in-process LRU cache."""
+
+    def test_get_and_set(self):
+        """Test storing and retrieving a value"""
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1, ttl_seconds=60)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted when full"""
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1, ttl_seconds=60)
+        cache.set('b', 2, ttl_seconds=60)
+        cache.get('a')
+        cache.set('c', 3, ttl_seconds=60)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_expired_entry(self):
+        """Test that expired entries are not returned"""
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1, ttl_seconds=-1)
+        self.assertIsNone(cache.get('a'))
+
+
+class TestPersistentCache(unittest.TestCase):
+    """Test cases for the persistent_cache decorator."""
+
+    def setUp(self):
+        """Set up an in-memory stand-in for Redis"""
+        self.store = {}
+        self.redis_patcher = patch('guaxinim.core.cache.redis_client')
+        self.mock_redis = self.redis_patcher.start()
+        self.mock_redis.get.side_effect = self.store.get
+        self.mock_redis.setex.side_effect = lambda key, ttl, value: self.store.__setitem__(key, value)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.redis_patcher.stop()
+
+    def test_fast_asdict(self):
+        """Test that fast_asdict matches the dataclass fields"""
+        data = CoffeePreparationData(issue_encountered="Too bitter", brewing_method="V60")
+        result = fast_asdict(data)
+        self.assertEqual(result['issue_encountered'], "Too bitter")
+        self.assertEqual(result['brewing_method'], "V60")
+        self.assertIsNone(result['notes'])
+
+    def test_cached_value_round_trip(self):
+        """Test that a cached response is decoded back into its return type"""
+        calls = MagicMock(return_value=Response(answer="Test answer", sources=[{'title': 'Bloom'}]))
+
+        @persistent_cache(ttl_days=1)
+        def answer(query: str) -> Response:
+            return calls(query)
+
+        first = answer("What is coffee bloom?")
+        self.assertIn(answer.cache_key("What is coffee bloom?"), self.store)
+
+        # A fresh decorator has an empty in-process cache, so this reads from Redis
+        @persistent_cache(ttl_days=1)
+        def answer(query: str) -> Response:  # pylint: disable=function-redefined
+            return calls(query)
+
+        second = answer("What is coffee bloom?")
+        self.assertEqual(first, second)
+        self.assertIsInstance(second, Response)
+        calls.assert_called_once()
+
+    def test_in_process_cache_skips_redis(self):
+        """Test that a repeated call is served without reading Redis"""
+        @persistent_cache(ttl_days=1)
+        def answer(query: str) -> str:
+            return query.upper()
+
+        self.assertEqual(answer("bloom"), "BLOOM")
+        self.mock_redis.get.reset_mock()
+        self.assertEqual(answer("bloom"), "BLOOM")
+        self.mock_redis.get.assert_not_called()
+
+    def test_bypass_cache_regenerates(self):
+        """Test that bypass_cache skips the lookup and overwrites the cached entry"""
+        calls = MagicMock(side_effect=["first", "second"])
+
+        @persistent_cache(ttl_days=1)
+        def answer(query: str) -> str:
+            return calls(query)
+
+        self.assertEqual(answer("bloom"), "first")
+        self.assertEqual(answer("bloom", bypass_cache=True), "second")
+        self.assertEqual(answer("bloom"), "second")
+        self.assertEqual(calls.call_count, 2)
+
+    def test_cache_key_includes_model_settings(self):
+        """Test that model and temperature are part of a method's cache key"""
+        class Bot:
+            GPT_MODEL = "model-a"
+            TEMPERATURE = 0.2
+            similarity_field = "chunks"
+
+            @persistent_cache(ttl_days=1)
+            def answer(self, query: str) -> str:
+                return query
+
+        bot = Bot()
+        key = Bot.answer.cache_key(bot, "bloom")
+        bot.GPT_MODEL = "model-b"
+        self.assertNotEqual(Bot.answer.cache_key(bot, "bloom"), key)
+
+    def test_normalizers_share_entries(self):
+        """Test that arguments with the same normalized value share a cache entry"""
+        @persistent_cache(ttl_days=1, normalizers={'query': str.lower})
+        def answer(query: str) -> str:
+            return query
+
+        self.assertEqual(answer.cache_key("Bloom"), answer.cache_key("bloom"))
+        self.assertEqual(answer.cache_key(query="Bloom"), answer.cache_key(query="bloom"))
+
+    def test_errors_are_not_cached(self):
+        """Test that error results are returned but not stored"""
+        error = MagicMock(is_error=True)
+        calls = MagicMock(return_value=error)
+
+        @persistent_cache(ttl_days=1)
+        def answer(query: str) -> Response:
+            return calls(query)
+
+        self.assertIs(answer("bloom"), error)
+        self.assertIs(answer("bloom"), error)
+        self.assertEqual(calls.call_count, 2)
+        self.assertEqual(self.store, {})
+
+    def test_concurrent_identical_calls_run_once(self):
+        """Test that identical calls made while one is executing share its result"""
+        started = threading.Event()
+        waiting = threading.Event()
+        release = threading.Event()
+        calls = MagicMock(return_value="answer")
+
+        class WatchedFuture(Future):
+            """Future signalling when a caller starts waiting on it"""
+            def result(self, timeout=None):
+                waiting.set()
+                return super().result(timeout)
+
+        @persistent_cache(ttl_days=1)
+        def answer(query: str) -> str:
+            started.set()
+            release.wait(timeout=5)
+            return calls(query)
+
+        with patch('guaxinim.core.cache.Future', WatchedFuture), ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(answer, "bloom")
+            self.assertTrue(started.wait(timeout=5))
+            second = executor.submit(answer, "bloom")
+            # Only release the first call once the second is waiting on its in-flight future
+            self.assertTrue(waiting.wait(timeout=5))
+            release.set()
+            self.assertEqual(first.result(), "answer")
+            self.assertEqual(second.result(), "answer")
+        calls.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -45,6 +45,24 @@ class TestCoffeePreparationData(unittest.TestCase):
         self.assertEqual(data.amount_in_each_pour, 83.33)
         self.assertEqual(data.notes, "First try with new beans")
 
+    def test_cache_bucket_merges_close_parameters(self):
+        """Test that small measurement differences map to the same cache bucket"""
+        first = CoffeePreparationData(
+            issue_encountered="Too bitter", brewing_method="V60",
+            amount_of_coffee=15.0, amount_of_water=250.0, water_temperature=93.5
+        )
+        second = CoffeePreparationData(
+            issue_encountered="too  bitter", brewing_method="V60",
+            amount_of_coffee=15.1, amount_of_water=252.0, water_temperature=94.0
+        )
+        self.assertEqual(first.cache_bucket(), second.cache_bucket())
+
+    def test_cache_bucket_separates_different_parameters(self):
+        """Test that meaningfully different parameters stay in different buckets"""
+        first = CoffeePreparationData(issue_encountered="Too bitter", brewing_method="V60", water_temperature=88.0)
+        second = CoffeePreparationData(issue_encountered="Too bitter", brewing_method="V60", water_temperature=96.0)
+        self.assertNotEqual(first.cache_bucket(), second.cache_bucket())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,45 @@
+"""
+Unit tests for the exact search fallback index
+"""
+
+import unittest
+import numpy as np
+
+from src.pdf_processor.exact_search import ExactIndex
+
+
+class TestExactIndex(unittest.TestCase):
+    """Test cases for the ExactIndex class."""
+
+    def setUp(self):
+        """Set up an index over random vectors"""
+        rng = np.random.default_rng(0)
+        self.embeddings = rng.standard_normal((50, 8)).astype(np.float32)
+        self.index = ExactIndex(8)
+        self.index.add(self.embeddings)
+
+    def test_search_matches_brute_force(self):
+        """Test that results match a brute-force squared L2 ranking"""
+        query = self.embeddings[:1] + 0.01
+        distances, indices = self.index.search(query, 5)
+
+        expected = ((self.embeddings - query) ** 2).sum(axis=1)
+        np.testing.assert_array_equal(indices[0], np.argsort(expected)[:5])
+        np.testing.assert_allclose(distances[0], np.sort(expected)[:5], rtol=1e-4, atol=1e-4)
+
+    def test_search_pads_missing_results(self):
+        """Test that asking for more results than indexed vectors pads with -1"""
+        index = ExactIndex(8)
+        index.add(self.embeddings[:2])
+        _, indices = index.search(self.embeddings[:1], 4)
+        self.assertEqual(indices[0, 0], 0)
+        self.assertEqual(list(indices[0, 2:]), [-1, -1])
+
+    def test_empty_index(self):
+        """Test that searching an empty index returns no results"""
+        _, indices = ExactIndex(8).search(self.embeddings[:1], 3)
+        self.assertTrue((indices == -1).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@
 Unit tests for the GuaxinimBot class
 """
 
+import asyncio
 import unittest
 from unittest.mock import patch, MagicMock
 
@@ -72,6 +73,64 @@ class TestGuaxinimBot(unittest.TestCase):
         self.assertIsInstance(response.sources, list)
         self.bot.client.chat.completions.create.assert_called_once()
 
+    def test_complete_streams_inside_streaming(self):
+        """Test that completions are streamed to the callback inside streaming()"""
+        chunks = []
+        for text in ["Bloom ", "releases ", "CO2"]:
+            chunk = MagicMock()
+            chunk.choices[0].delta.content = text
+            chunks.append(chunk)
+        self.bot.client.chat.completions.create.return_value = iter(chunks)
+
+        received = []
+        with self.bot.streaming(received.append):
+            answer = self.bot._complete([{"role": "user", "content": "What is bloom?"}], max_tokens=10)
+
+        self.assertEqual(answer, "Bloom releases CO2")
+        self.assertEqual(received, ["Bloom ", "releases ", "CO2"])
+        _, kwargs = self.bot.client.chat.completions.create.call_args
+        self.assertTrue(kwargs['stream'])
+
+    def test_warm_guides(self):
+        """Test that warming requests a guide for each method"""
+        with patch.object(GuaxinimBot, 'get_coffee_guide', return_value="Test guide") as mock_guide:
+            futures = self.bot.warm_guides(("V60", "Chemex"))
+            self.assertEqual([future.result() for future in futures], ["Test guide", "Test guide"])
+        self.assertEqual(mock_guide.call_count, 2)
+
+    def test_async_variants_can_be_gathered(self):
+        """Test that the async variants run the sync methods and can be gathered"""
+        async def ask_both():
+            return await asyncio.gather(
+                self.bot.ask_guaxinim_async("What is coffee bloom?"),
+                self.bot.ask_guaxinim_async("How should I store coffee beans?")
+            )
+
+        with patch.object(GuaxinimBot, 'ask_guaxinim', side_effect=lambda query, **kwargs: query) as mock_ask:
+            answers = asyncio.run(ask_both())
+        self.assertEqual(answers, ["What is coffee bloom?", "How should I store coffee beans?"])
+        self.assertEqual(mock_ask.call_count, 2)
+
+    def test_ask_guaxinim_stream(self):
+        """Test that streamed pieces are yielded and the response is returned"""
+        chunks = []
+        for text in ["Bloom ", "releases CO2"]:
+            chunk = MagicMock()
+            chunk.choices[0].delta.content = text
+            chunks.append(chunk)
+        self.bot.client.chat.completions.create.return_value = iter(chunks)
+
+        stream = self.bot.ask_guaxinim_stream("What is coffee bloom?")
+        pieces = []
+        try:
+            while True:
+                pieces.append(next(stream))
+        except StopIteration as stop:
+            response = stop.value
+
+        self.assertEqual(pieces, ["Bloom ", "releases CO2"])
+        self.assertEqual(response.answer, "Bloom releases CO2")
+
 
 if __name__ == '__main__':
     unittest.main()
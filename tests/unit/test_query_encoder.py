@@ -0,0 +1,56 @@
+"""
+Unit tests for the batching query encoder
+"""
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+import numpy as np
+
+from guaxinim.core.query_encoder import BatchingQueryEncoder
+
+
+class TestBatchingQueryEncoder(unittest.TestCase):
+    """Test cases for the BatchingQueryEncoder class."""
+
+    def setUp(self):
+        """Set up a model that embeds each query as its length"""
+        self.model = MagicMock()
+        self.model.encode.side_effect = lambda queries: np.array([[len(q), 1.0] for q in queries])
+
+    def test_encode_single_query(self):
+        """Test that a single query is returned as a float32 row vector"""
+        encoder = BatchingQueryEncoder(self.model)
+        embedding = encoder.encode("bloom")
+        self.assertEqual(embedding.shape, (1, 2))
+        self.assertEqual(embedding.dtype, np.float32)
+        self.assertEqual(embedding[0, 0], 5)
+
+    def test_concurrent_queries_are_batched(self):
+        """Test that concurrent queries share encoder calls and get their own rows"""
+        encoder = BatchingQueryEncoder(self.model, max_wait=0.2)
+        queries = ["a" * n for n in range(1, 9)]
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            embeddings = list(executor.map(encoder.encode, queries))
+
+        self.assertEqual([int(e[0, 0]) for e in embeddings], list(range(1, 9)))
+        self.assertLess(self.model.encode.call_count, len(queries))
+
+    def test_repeated_query_is_cached(self):
+        """Test that a repeated query is served without calling the model again"""
+        encoder = BatchingQueryEncoder(self.model)
+        first = encoder.encode("bloom")
+        second = encoder.encode("bloom")
+        np.testing.assert_array_equal(first, second)
+        self.model.encode.assert_called_once()
+
+    def test_encoder_errors_are_raised(self):
+        """Test that an encoder failure is raised to the caller"""
+        self.model.encode.side_effect = RuntimeError("model failed")
+        encoder = BatchingQueryEncoder(self.model)
+        with self.assertRaises(RuntimeError):
+            encoder.encode("bloom")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Unit tests for the semantic cache
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+
+from guaxinim.core.cache import clear_cache
+from guaxinim.core.semantic_cache import SemanticCache
+
+
+@unittest.skipUnless(SemanticCache.AVAILABLE, "FAISS is not installed")
+class TestSemanticCache(unittest.TestCase):
+    """Test cases for the SemanticCache class."""
+
+    def setUp(self):
+        """Set up an in-memory stand-in for Redis and a fixed query encoder"""
+        self.store = {}
+        self.redis_patcher = patch('guaxinim.core.semantic_cache.redis_client')
+        self.mock_redis = self.redis_patcher.start()
+        self.mock_redis.hgetall.side_effect = lambda key: dict(self.store.get(key, {}))
+        self.mock_redis.hset.side_effect = lambda key, field, value: self.store.setdefault(key, {}).__setitem__(field, value)
+        self.mock_redis.hdel.side_effect = lambda key, *fields: [self.store.get(key, {}).pop(field, None) for field in fields]
+        self.cache_redis_patcher = patch('guaxinim.core.cache.redis_client')
+        self.mock_cache_redis = self.cache_redis_patcher.start()
+        self.mock_cache_redis.scan.side_effect = lambda cursor, match: (0, list(self.store))
+        self.mock_cache_redis.delete.side_effect = lambda *keys: [self.store.pop(key, None) for key in keys]
+
+        self.time_patcher = patch('guaxinim.core.semantic_cache.time')
+        self.mock_time = self.time_patcher.start()
+        self.mock_time.time.return_value = 1000.0
+
+        encoder = MagicMock()
+        encoder.encode.return_value = np.array([[0.1, 0.2, 0.3]], dtype=np.float32)
+        self.cache = SemanticCache(encoder, value_type=str, ttl_days=7)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.time_patcher.stop()
+        self.cache_redis_patcher.stop()
+        self.redis_patcher.stop()
+
+    def test_get_similar_entry(self):
+        """Test that an entry is returned for the same query"""
+        embedding = self.cache.embed('How do I brew a V60?')
+        self.cache.add('ask', 'How do I brew a V60?', embedding, 'Use a 1:16 ratio')
+        self.assertEqual(self.cache.get('ask', embedding), 'Use a 1:16 ratio')
+
+    def test_expired_entry_is_dropped(self):
+        """Test that an expired nearest entry is dropped and does not hide a fresh one"""
+        embedding = self.cache.embed('How do I brew a V60?')
+        self.cache.add('ask', 'How do I brew a V60?', embedding, 'Old answer')
+
+        # Past the TTL the entry is no longer served and is removed from the index and Redis
+        self.mock_time.time.return_value = 1000.0 + self.cache.ttl_seconds + 1
+        self.assertIsNone(self.cache.get('ask', embedding))
+        self.assertEqual(self.cache.indexes['ask'].ntotal, 0)
+        self.assertEqual(self.cache.values['ask'], [])
+        self.assertFalse(self.store.get(SemanticCache.REDIS_PREFIX + 'ask'))
+
+        # A new answer for the same query is served
+        self.cache.add('ask', 'How do I brew a V60?', embedding, 'New answer')
+        self.assertEqual(self.cache.get('ask', embedding), 'New answer')
+
+    def test_clear_cache_resets_index(self):
+        """Test that clear_cache drops entries from the in-memory indexes"""
+        embedding = self.cache.embed('How do I brew a V60?')
+        self.cache.add('ask', 'How do I brew a V60?', embedding, 'Use a 1:16 ratio')
+        clear_cache()
+        self.assertIsNone(self.cache.get('ask', embedding))
+
+
+if __name__ == '__main__':
+    unittest.main()
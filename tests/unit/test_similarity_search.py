@@ -107,6 +107,7 @@ class TestDocumentSearcher(unittest.TestCase):
         self.assertEqual(result['source'], 'https://test.com/coffee-guide')
         self.assertEqual(result['chunk_text'], 'How to make great coffee')
         self.assertAlmostEqual(result['similarity_score'], 0.8)  # 1 - 0.4/2
+        self.assertIs(type(result['similarity_score']), float)
 
     def test_collect_search_results_with_titles(self):
         """Test collecting search results for title search"""
@@ -202,6 +203,24 @@ class TestDocumentSearcher(unittest.TestCase):
         # Verify results
         self.assertEqual(len(results), 0)  # Should return empty list
 
+    def test_collect_search_results_min_score(self):
+        """Test that results not scoring above min_score are skipped"""
+        # Similarity scores 0.8 and 0.4
+        distances = np.array([0.4, 1.2])
+        indices = np.array([0, 0])
+
+        # Call the method
+        results = self.searcher._collect_search_results(
+            distances=distances,
+            indices=indices,
+            search_type='chunk',
+            min_score=0.5
+        )
+
+        # Verify results
+        self.assertEqual(len(results), 1)
+        self.assertAlmostEqual(results[0]['similarity_score'], 0.8)
+
     def test_get_tags_with_frequency(self):
         """Test getting tags with their frequencies"""
         # Get tags with frequencies
@@ -0,0 +1,53 @@
+"""
+Unit tests for token counting and context packing
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from guaxinim.core.tokens import CHARS_PER_TOKEN, pack_to_budget
+
+
+class TestPackToBudget(unittest.TestCase):
+    """Test cases for packing context parts with the character-based estimate."""
+
+    def setUp(self):
+        """Use the character-based estimate"""
+        self.encoding_patcher = patch('guaxinim.core.tokens.get_encoding', return_value=None)
+        self.encoding_patcher.start()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.encoding_patcher.stop()
+
+    def test_all_parts_fit(self):
+        """Test that parts within the budget are all kept in order"""
+        parts = ["a" * 40, "b" * 40]
+        self.assertEqual(pack_to_budget(parts, 21, "model"), parts)
+
+    def test_counts_separators(self):
+        """Test that the separators the parts are joined with count towards the budget"""
+        parts = ["a" * 40, "b" * 40]
+        self.assertEqual(pack_to_budget(parts, 20, "model"), ["a" * 40])
+
+    def test_stops_at_budget(self):
+        """Test that packing stops at the first part that does not fit"""
+        parts = ["a" * 40, "b" * 80, "c" * 4]
+        self.assertEqual(pack_to_budget(parts, 25, "model"), ["a" * 40])
+
+    def test_truncates_oversized_first_part(self):
+        """Test that a first part larger than the budget is truncated"""
+        packed = pack_to_budget(["a" * 400], 10, "model")
+        self.assertEqual(packed, ["a" * (10 * CHARS_PER_TOKEN)])
+
+    def test_small_context_skips_tokenizer(self):
+        """Test that a context far below the budget is kept without tokenizing"""
+        encoding = MagicMock()
+        with patch('guaxinim.core.tokens.get_encoding', return_value=encoding):
+            parts = ["a" * 40, "b" * 40]
+            self.assertEqual(pack_to_budget(parts, 100, "model"), parts)
+        encoding.encode.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()